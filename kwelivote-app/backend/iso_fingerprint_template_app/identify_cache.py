@@ -0,0 +1,58 @@
+import threading
+import time
+
+"""
+Short-lived TTL cache for fingerprint identification results.
+
+Identification workflows often re-submit the same probe image (retries,
+multi-finger batches), and each identify call runs bozorth3 against the whole
+gallery. Caching the computed match results for a few seconds, keyed by the
+probe image hash, makes those repeats return instantly.
+
+Entries are implicitly invalidated whenever a FingerprintTemplate row changes:
+the signal handlers in signals.py bump the cache epoch, which is part of every
+cache key.
+"""
+
+TTL_SECONDS = 30
+MAX_ENTRIES = 512
+
+_cache = {}
+_lock = threading.Lock()
+_epoch = 0
+
+
+def current_epoch():
+    """Return the current cache epoch (changes whenever templates change)"""
+    return _epoch
+
+
+def bump_epoch():
+    """Invalidate all cached results by moving to a new epoch"""
+    global _epoch
+    with _lock:
+        _epoch += 1
+        _cache.clear()
+
+
+def get(key):
+    """Return the cached value for key, or None if missing or expired"""
+    with _lock:
+        entry = _cache.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del _cache[key]
+            return None
+        return value
+
+
+def put(key, value):
+    """Store a value for key, evicting the oldest entries when full"""
+    with _lock:
+        if len(_cache) >= MAX_ENTRIES:
+            # Drop the soonest-to-expire entries to make room
+            for old_key in sorted(_cache, key=lambda k: _cache[k][0])[:MAX_ENTRIES // 4]:
+                del _cache[old_key]
+        _cache[key] = (time.monotonic() + TTL_SECONDS, value)
@@ -1,5 +1,12 @@
+import zlib
+
 from django.db import models
 
+# zlib streams start with 0x78 ('x'); XYT text always starts with a digit,
+# sign or whitespace, so the first byte reliably marks a compressed row
+_ZLIB_PREFIX = b'\x78'
+
+
 class FingerprintTemplate(models.Model):
     """Model to store ISO fingerprint templates and processing results"""
     created_at = models.DateTimeField(auto_now_add=True)
@@ -12,7 +19,32 @@ class FingerprintTemplate(models.Model):
     metadata = models.JSONField(null=True, blank=True, help_text="Helper data for template fusion and verification")
     national_id = models.CharField(max_length=50, null=False, blank=False, db_index=True, help_text="National ID for the person this fingerprint belongs to")
     xyt_data = models.BinaryField(null=True, blank=True, help_text="Raw MINDTCT XYT data for use with BOZORTH3")
+    is_canonicalized = models.BooleanField(default=True, help_text="True when xyt_data was canonicalized/quantized at enrollment, so matching can skip the stored-side pipeline")
     
+    def set_xyt_data(self, xyt_bytes, level=3):
+        """
+        Store XYT bytes zlib-compressed. ASCII XYT text compresses several
+        times over, which shrinks row size and the I/O spent on every
+        read/write of the template.
+        """
+        self.xyt_data = zlib.compress(xyt_bytes, level) if xyt_bytes else xyt_bytes
+
+    def get_xyt_data(self):
+        """
+        Return the raw XYT bytes, transparently decompressing rows written
+        by set_xyt_data. Legacy uncompressed rows are returned as-is.
+        """
+        data = self.xyt_data
+        if data is None:
+            return None
+        data = bytes(data)
+        if data[:1] == _ZLIB_PREFIX:
+            try:
+                return zlib.decompress(data)
+            except zlib.error:
+                pass
+        return data
+
     def __str__(self):
         if self.national_id:
             return f"Template {self.id} - National ID: {self.national_id} - Status: {self.processing_status}"
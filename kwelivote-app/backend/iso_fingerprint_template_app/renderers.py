@@ -0,0 +1,35 @@
+import logging
+
+from rest_framework.renderers import JSONRenderer
+
+logger = logging.getLogger(__name__)
+
+# orjson is optional: it serializes straight to bytes in C, several times
+# faster than stdlib json on the template payloads (which carry base64
+# blobs). When it is not installed we fall back to DRF's stock renderer.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    logger.info("orjson not installed; JSON responses use the stdlib renderer")
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    DRF renderer backed by orjson when available.
+
+    Falls back to JSONRenderer for indented (browsable API) output, which
+    orjson's two-space indent cannot reproduce byte-for-byte, and whenever
+    orjson is missing or cannot serialize the payload.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            return orjson.dumps(data)
+        except TypeError:
+            # Payload contains a type orjson does not handle natively
+            return super().render(data, accepted_media_type, renderer_context)
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import FingerprintTemplate
+from . import identify_cache
+
+
+@receiver(post_save, sender=FingerprintTemplate)
+@receiver(post_delete, sender=FingerprintTemplate)
+def invalidate_identify_cache(sender, **kwargs):
+    """Any change to the stored template gallery invalidates cached identification results"""
+    identify_cache.bump_epoch()
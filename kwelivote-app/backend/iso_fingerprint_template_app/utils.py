@@ -2,6 +2,7 @@ import os
 import tempfile
 import subprocess
 import logging
+import re
 import shutil
 import numpy as np
 import cv2
@@ -13,6 +14,70 @@ from io import BytesIO
 
 logger = logging.getLogger(__name__)
 
+# Resolve the NBIS binary once at import time: shutil.which walks PATH
+# with a stat per directory, which has no place in the request hot path.
+# Passing the absolute path to subprocess also skips kernel PATH lookups.
+_MINDTCT = shutil.which('mindtct')
+
+# Matcher scratch space: prefer tmpfs so the per-match temp files are
+# RAM-backed instead of hitting (and wearing) persistent storage
+_TMPFS_DIR = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+# Well-formed XYT content: 3 or 4 integer fields per line. Files matching
+# this (normal mindtct output) validate in one regex pass; only unusual
+# content pays for per-line validation.
+_XYT_WELLFORMED_RE = re.compile(
+    r'-?\d+[ \t]+-?\d+[ \t]+-?\d+([ \t]+-?\d+)?'
+    r'([ \t]*\r?\n\s*-?\d+[ \t]+-?\d+[ \t]+-?\d+([ \t]+-?\d+)?)*'
+)
+
+
+def _clamp_xyt_file(xyt_path):
+    """
+    Clamp X, Y and theta values in a mindtct XYT file to a maximum of 499,
+    rewrite the file, and return the rewritten bytes.
+
+    The whole file is parsed with NumPy in one pass instead of per-line
+    int(float()) conversions. A file NumPy cannot parse is returned as-is.
+    """
+    try:
+        arr = np.loadtxt(xyt_path, ndmin=2)
+    except Exception as e:
+        logger.warning("Could not parse XYT file %s for clamping: %s", xyt_path, str(e))
+        arr = None
+    if arr is None or arr.size == 0 or arr.shape[1] < 3:
+        with open(xyt_path, 'rb') as f:
+            return f.read()
+    
+    vals = arr[:, :3].astype(int)
+    clamped = np.minimum(vals, 499)
+    changed = int(np.count_nonzero((clamped != vals).any(axis=1)))
+    if changed:
+        logger.info("Clamped minutiae values on %s lines in %s", changed, os.path.basename(xyt_path))
+    
+    xyt_data = (b'%d %d %d\n' * len(clamped)) % tuple(clamped.ravel().tolist())
+    with open(xyt_path, 'wb') as f:
+        f.write(xyt_data)
+    return xyt_data
+
+
+def error_message(exc, limit=500):
+    """
+    Return a bounded, human-readable message for an exception.
+
+    Prefers the first exception argument when it is already a string so
+    __str__ is not re-invoked (subprocess errors can pull megabytes of
+    stderr into their string form), and caps the result so pathological
+    exceptions cannot bloat API responses.
+    """
+    args = getattr(exc, 'args', None)
+    if args and isinstance(args[0], str):
+        msg = args[0]
+    else:
+        msg = str(exc)
+    return msg[:limit]
+
+
 """
 IMPORTANT: These utility functions ensure consistent fingerprint processing
 across the application. They are used by both template creation and fingerprint
@@ -26,31 +91,49 @@ these functions must be thoroughly tested to ensure it doesn't reduce match accu
 def normalize_image(image_data):
     """
     Normalize image data to ensure consistent format.
-    Handles both raw image data bytes and base64-encoded strings.
-    
+    Handles raw image data bytes, base64-encoded strings and binary
+    file-like objects (e.g. BytesIO or an open upload stream).
+
     Args:
-        image_data: Raw image data bytes or base64-encoded string
-        
+        image_data: Raw image data bytes, base64-encoded string, or file-like
+
     Returns:
         Normalized image data bytes
     """
     try:
         # Check if input is a base64-encoded string
         if isinstance(image_data, str):
-            # Remove any potential data URL prefix
-            if ',' in image_data:
-                image_data = image_data.split(',', 1)[1]
+            # Strip any data URL prefix with a single rpartition pass instead
+            # of scanning the string twice with 'in' + split
+            encoded = image_data.encode('ascii')
+            _, sep, tail = encoded.rpartition(b',')
+            if sep:
+                encoded = tail
+            
+            # Repair missing padding up front rather than letting b64decode fail
+            if len(encoded) & 3:
+                encoded += b'=' * (-len(encoded) & 3)
             
             try:
                 # Decode base64 to bytes
-                image_data = base64.b64decode(image_data)
-                logger.info(f"Successfully decoded base64 string to image data: {len(image_data)} bytes")
+                image_data = base64.b64decode(encoded)
+                logger.info("Successfully decoded base64 string to image data: %s bytes", len(image_data))
             except Exception as e:
-                logger.error(f"Failed to decode base64 string: {str(e)}")
+                logger.error("Failed to decode base64 string: %s", str(e))
                 raise
         
-        # Open image from bytes
-        with Image.open(BytesIO(image_data)) as img:
+        # Open image from bytes; file-like inputs go straight to PIL
+        # without materializing an intermediate copy
+        source = image_data if hasattr(image_data, 'read') else BytesIO(image_data)
+        with Image.open(source) as img:
+            # Fast path: an already-normalized capture (500x550 8-bit
+            # grayscale PNG) needs no resample or re-encode - return the
+            # original bytes untouched
+            if (isinstance(image_data, bytes) and img.format == 'PNG'
+                    and img.mode == 'L' and img.size == (500, 550)):
+                logger.info("Image already normalized (500x550 grayscale PNG); skipping re-encode")
+                return image_data
+
             # Convert to RGB mode if needed (some PNG files might be in RGBA)
             if img.mode == 'RGBA':
                 img = img.convert('RGB')
@@ -60,7 +143,7 @@ def normalize_image(image_data):
             
             # Resize to standard dimensions if needed
             if img.size != (500, 550):
-                logger.info(f"Resizing image from {img.size} to (500, 550)")
+                logger.info("Resizing image from %s to (500, 550)", img.size)
                 img = img.resize((500, 550), Image.Resampling.LANCZOS)
             
             # Convert to grayscale if not already
@@ -68,15 +151,17 @@ def normalize_image(image_data):
                 img = img.convert('L')
                 logger.info("Converted image to grayscale (8-bit)")
             
-            # Save normalized image
+            # Save normalized image. The PNG is ephemeral input for
+            # mindtct, so the lightest compression level wins: encode is
+            # several times faster and the pixels are identical
             output = BytesIO()
-            img.save(output, format='PNG')
+            img.save(output, format='PNG', compress_level=1)
             normalized_data = output.getvalue()
-            logger.info(f"Normalized image size: {len(normalized_data)} bytes")
+            logger.info("Normalized image size: %s bytes", len(normalized_data))
             return normalized_data
             
     except Exception as e:
-        logger.error(f"Error normalizing image: {str(e)}")
+        logger.error("Error normalizing image: %s", str(e))
         raise
 
 def extract_minutiae(image_path, output_dir):
@@ -92,16 +177,20 @@ def extract_minutiae(image_path, output_dir):
     """
     output_basename = os.path.join(output_dir, "probe")
     
-    logger.info(f"Extracting minutiae from image: {os.path.basename(image_path)}")
-    logger.info(f"Image size: {os.path.getsize(image_path)} bytes")
+    logger.info("Extracting minutiae from image: %s", os.path.basename(image_path))
     
-    # First, check if the image file actually exists and is readable
-    if not os.path.isfile(image_path):
-        logger.error(f"Image file does not exist: {image_path}")
+    # First, check if the image file actually exists and is non-empty
+    # (one stat syscall covers both checks)
+    try:
+        image_stat = os.stat(image_path)
+    except FileNotFoundError:
+        logger.error("Image file does not exist: %s", image_path)
         raise FileNotFoundError(f"Image file does not exist: {image_path}")
     
-    if os.path.getsize(image_path) == 0:
-        logger.error(f"Image file is empty: {image_path}")
+    logger.info("Image size: %s bytes", image_stat.st_size)
+    
+    if image_stat.st_size == 0:
+        logger.error("Image file is empty: %s", image_path)
         raise ValueError(f"Image file is empty: {image_path}")
         
     # Verify the image is readable by PIL before proceeding
@@ -109,167 +198,120 @@ def extract_minutiae(image_path, output_dir):
         with Image.open(image_path) as img:
             img_width, img_height = img.size
             img_mode = img.mode
-            logger.info(f"Image successfully read: size={img_width}x{img_height}, mode={img_mode}")
+            logger.info("Image successfully read: size=%sx%s, mode=%s", img_width, img_height, img_mode)
     except Exception as e:
-        logger.error(f"Failed to read image with PIL: {str(e)}")
+        logger.error("Failed to read image with PIL: %s", str(e))
         raise ValueError(f"Invalid image file: {str(e)}")
     
     # Create a backup of the image for debugging
     debug_img_path = os.path.join(output_dir, "debug_input_image.png")
     try:
         shutil.copy(image_path, debug_img_path)
-        logger.info(f"Created backup of input image at {debug_img_path}")
+        logger.info("Created backup of input image at %s", debug_img_path)
     except Exception as e:
-        logger.warning(f"Could not create backup of input image: {str(e)}")
+        logger.warning("Could not create backup of input image: %s", str(e))
     
     try:
         # Log detailed parameters used for minutiae extraction
-        logger.info(f"Running MINDTCT with parameters: -m1 {image_path} {output_basename}")
+        logger.info("Running MINDTCT with parameters: -m1 %s %s", image_path, output_basename)
+        
+        if not _MINDTCT:
+            raise Exception("NBIS tool 'mindtct' is not available in the system PATH")
         
-        # Run MINDTCT to extract minutiae
+        # Run MINDTCT to extract minutiae. Its stdout is never read, so
+        # send it to /dev/null instead of allocating and decoding a pipe;
+        # only stderr is kept for error reporting
         process = subprocess.run(
-            ["mindtct", "-m1", image_path, output_basename], 
+            [_MINDTCT, "-m1", image_path, output_basename], 
             check=True, 
-            capture_output=True,
-            text=True
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE
         )
         logger.info("Successfully processed fingerprint with mindtct")
         
         # Read the minutiae template file (.xyt format)
+        # One stat covers both the existence and the non-empty check
         xyt_path = f"{output_basename}.xyt"
-        if os.path.exists(xyt_path) and os.path.getsize(xyt_path) > 0:
-            # Read the XYT file, apply clamping, and write it back
-            with open(xyt_path, 'r') as f:
-                lines = f.readlines()
-            
-            # Process each line to clamp values > 499 to 499
-            modified_lines = []
-            for line in lines:
-                parts = line.strip().split()
-                if len(parts) >= 3:
-                    try:
-                        x = int(float(parts[0]))
-                        y = int(float(parts[1]))
-                        theta = int(float(parts[2]))
-                        
-                        # Clamp X, Y, and T values to a maximum of 499
-                        clamped_x = min(499, x)
-                        clamped_y = min(499, y)
-                        clamped_theta = min(499, theta)
-                        
-                        if x != clamped_x or y != clamped_y or theta != clamped_theta:
-                            logger.info(f"Clamped minutiae values: ({x},{y},{theta}) -> ({clamped_x},{clamped_y},{clamped_theta})")
-                        
-                        # Add the clamped line
-                        modified_lines.append(f"{clamped_x} {clamped_y} {clamped_theta}\n")
-                    except (ValueError, IndexError):
-                        # If we can't parse the line, keep it as is
-                        modified_lines.append(line)
-                else:
-                    # Keep lines with unexpected format as they are
-                    modified_lines.append(line)
-            
-            # Write the modified lines back to the file
-            with open(xyt_path, 'w') as f:
-                f.writelines(modified_lines)
-                
-            # Now read the file as binary data for return
-            with open(xyt_path, 'rb') as f:
-                xyt_data = f.read()
+        try:
+            xyt_size = os.stat(xyt_path).st_size
+        except FileNotFoundError:
+            xyt_size = 0
+        if xyt_size > 0:
+            # Parse, clamp values > 499, and rewrite in one vectorized pass
+            xyt_data = _clamp_xyt_file(xyt_path)
             
             # Log the minutiae count for debugging
-            minutiae_count = len(xyt_data.splitlines()) if isinstance(xyt_data, str) else xyt_data.count(b'\n') + 1
-            logger.info(f"Extracted {minutiae_count} minutiae points from fingerprint")
-            logger.info(f"XYT data size: {len(xyt_data)} bytes")
+            minutiae_count = xyt_data.count(b'\n') + 1
+            logger.info("Extracted %s minutiae points from fingerprint", minutiae_count)
+            logger.info("XYT data size: %s bytes", len(xyt_data))
             
             return xyt_data
         else:
-            logger.error(f"XYT file not created or is empty: {xyt_path}")
+            logger.error("XYT file not created or is empty: %s", xyt_path)
             raise Exception("XYT file not created or is empty")
             
     except subprocess.CalledProcessError as e:
-        error_msg = e.stderr if e.stderr else str(e)
-        logger.error(f"mindtct error (exit code {e.returncode}): {error_msg}")
+        error_msg = e.stderr.decode(errors='replace') if e.stderr else str(e)
+        logger.error("mindtct error (exit code %s): %s", e.returncode, error_msg)
         
         # Try with PGM format
         try:
             pgm_path = os.path.join(output_dir, "probe.pgm")
-            logger.info("Trying alternative format conversion for fingerprint")
             
-            # Log the conversion command
-            convert_cmd = f"convert {image_path} -colorspace gray -depth 8 {pgm_path}"
-            logger.info(f"Running conversion: {convert_cmd}")
+            # If the input is already a binary PGM (magic 'P5'), mindtct can
+            # consume it directly - no need to invoke ImageMagick
+            with open(image_path, 'rb') as img_file:
+                is_pgm = img_file.read(2) == b'P5'
             
-            subprocess.run([
-                "convert", image_path, 
-                "-colorspace", "gray",
-                "-depth", "8",
-                pgm_path
-            ], check=True, capture_output=True)
+            if is_pgm:
+                logger.info("Input image is already PGM; skipping format conversion")
+                shutil.copy(image_path, pgm_path)
+            else:
+                # Binary PGM is a three-line ASCII header plus raw pixels,
+                # so write it in-process instead of forking ImageMagick
+                # (which costs a full process load just for this)
+                logger.info("Converting fingerprint to PGM for mindtct")
+                with Image.open(image_path) as img:
+                    if img.mode != 'L':
+                        img = img.convert('L')
+                    width, height = img.size
+                    with open(pgm_path, 'wb') as pgm_file:
+                        pgm_file.write(b'P5\n%d %d\n255\n' % (width, height))
+                        pgm_file.write(img.tobytes())
             
-            logger.info(f"Running MINDTCT with PGM format: -m1 {pgm_path} {output_basename}")
+            logger.info("Running MINDTCT with PGM format: -m1 %s %s", pgm_path, output_basename)
             process = subprocess.run(
-                ["mindtct", "-m1", pgm_path, output_basename], 
+                [_MINDTCT, "-m1", pgm_path, output_basename], 
                 check=True, 
-                capture_output=True,
-                text=True
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE
             )
             logger.info("Successfully processed fingerprint with PGM format")
             
             # Read the minutiae template file (.xyt format)
             xyt_path = f"{output_basename}.xyt"
-            if os.path.exists(xyt_path) and os.path.getsize(xyt_path) > 0:
-                # Read the XYT file, apply clamping, and write it back
-                with open(xyt_path, 'r') as f:
-                    lines = f.readlines()
-                
-                # Process each line to clamp values > 499 to 499
-                modified_lines = []
-                for line in lines:
-                    parts = line.strip().split()
-                    if len(parts) >= 3:
-                        try:
-                            x = int(float(parts[0]))
-                            y = int(float(parts[1]))
-                            theta = int(float(parts[2]))
-                            
-                            # Clamp X, Y, and T values to a maximum of 499
-                            clamped_x = min(499, x)
-                            clamped_y = min(499, y)
-                            clamped_theta = min(499, theta)
-                            
-                            if x != clamped_x or y != clamped_y or theta != clamped_theta:
-                                logger.info(f"Clamped minutiae values: ({x},{y},{theta}) -> ({clamped_x},{clamped_y},{clamped_theta})")
-                            
-                            # Add the clamped line
-                            modified_lines.append(f"{clamped_x} {clamped_y} {clamped_theta}\n")
-                        except (ValueError, IndexError):
-                            # If we can't parse the line, keep it as is
-                            modified_lines.append(line)
-                    else:
-                        # Keep lines with unexpected format as they are
-                        modified_lines.append(line)
-                
-                # Write the modified lines back to the file
-                with open(xyt_path, 'w') as f:
-                    f.writelines(modified_lines)
-                    
-                # Now read the file as binary data for return
-                with open(xyt_path, 'rb') as f:
-                    xyt_data = f.read()
+            try:
+                xyt_size = os.stat(xyt_path).st_size
+            except FileNotFoundError:
+                xyt_size = 0
+            if xyt_size > 0:
+                # Parse, clamp values > 499, and rewrite in one vectorized pass
+                xyt_data = _clamp_xyt_file(xyt_path)
                 
                 # Log the minutiae count for debugging
-                minutiae_count = len(xyt_data.splitlines()) if isinstance(xyt_data, str) else xyt_data.count(b'\n') + 1
-                logger.info(f"Extracted {minutiae_count} minutiae points from fingerprint (PGM format)")
-                logger.info(f"XYT data size: {len(xyt_data)} bytes")
+                minutiae_count = xyt_data.count(b'\n') + 1
+                logger.info("Extracted %s minutiae points from fingerprint (PGM format)", minutiae_count)
+                logger.info("XYT data size: %s bytes", len(xyt_data))
                 
                 return xyt_data
             else:
-                logger.error(f"XYT file not created or is empty after PGM conversion: {xyt_path}")
+                logger.error("XYT file not created or is empty after PGM conversion: %s", xyt_path)
                 raise Exception("XYT file not created or is empty after PGM conversion")
                 
         except Exception as pgm_error:
-            logger.error(f"PGM conversion/processing failed: {str(pgm_error)}")
+            logger.error("PGM conversion/processing failed: %s", str(pgm_error))
             raise Exception(f"Failed to extract minutiae: {str(pgm_error)}")
 
 class Bozorth3Matcher:
@@ -282,7 +324,7 @@ class Bozorth3Matcher:
         # Helper method to validate XYT file content before passing to Bozorth3
         # Ensures each line has 3 or 4 numeric values (x, y, theta, optional quality)
         if not xyt_data:
-            logger.warning(f"XYT data for {filename} is empty.")
+            logger.warning("XYT data for %s is empty.", filename)
             return False
         try:
             # Decode if bytes. XYT files are expected to be text-based.
@@ -292,31 +334,38 @@ class Bozorth3Matcher:
                 except UnicodeDecodeError:
                     # Handle encoding issues gracefully - try alternative decoding approaches
                     # Some XYT data might be stored in different encodings or have binary artifacts
-                    logger.warning(f"XYT data for {filename} could not be decoded as UTF-8. Attempting alternative decoding methods.")
+                    logger.warning("XYT data for %s could not be decoded as UTF-8. Attempting alternative decoding methods.", filename)
                     
                     try:
                         # Try latin-1 encoding as a fallback (handles binary data as well)
                         data_to_check = xyt_data.decode('latin-1')
-                        logger.info(f"Successfully decoded XYT data for {filename} using latin-1 encoding.")
+                        logger.info("Successfully decoded XYT data for %s using latin-1 encoding.", filename)
                     except UnicodeDecodeError:
                         try:
                             # Try ignoring decode errors to extract what we can
                             data_to_check = xyt_data.decode('utf-8', errors='ignore')
-                            logger.warning(f"XYT data for {filename} decoded with errors ignored. Some data may be lost.")
+                            logger.warning("XYT data for %s decoded with errors ignored. Some data may be lost.", filename)
                         except Exception:
                             # If all decoding attempts fail, log the issue and return False
                             # This prevents the matching process from crashing due to encoding issues
-                            logger.error(f"XYT data for {filename} could not be decoded with any supported encoding. "
-                                       "The data is likely corrupted or in an unsupported format. Skipping validation.")
+                            logger.error("XYT data for %s could not be decoded with any supported encoding. The data is likely corrupted or in an unsupported format. Skipping validation.", filename)
                             return False
             else:
                 data_to_check = xyt_data # Assume it's already a string
 
-            lines = data_to_check.strip().split('\n')
-            if not lines or (len(lines) == 1 and not lines[0].strip()): # Handle empty or just newline
-                logger.warning(f"XYT data for {filename} is effectively empty after stripping.")
+            stripped = data_to_check.strip()
+            if not stripped: # Handle empty or just newline
+                logger.warning("XYT data for %s is effectively empty after stripping.", filename)
                 return False
 
+            # Fast path: a single C-level regex pass accepts well-formed
+            # files (3 or 4 integer fields per line, the normal mindtct
+            # output) without looping over lines in Python. Anything it
+            # does not match falls through to the detailed per-line check.
+            if _XYT_WELLFORMED_RE.fullmatch(stripped):
+                return True
+
+            lines = stripped.split('\n')
             for i, line in enumerate(lines):
                 line = line.strip()
                 if not line:  # Skip empty lines if any persist
@@ -324,12 +373,12 @@ class Bozorth3Matcher:
                 parts = line.split()
                 # Validate that parts are numeric (integers or floats)
                 if not (3 <= len(parts) <= 4 and all(p.replace('.', '', 1).lstrip('-').isdigit() for p in parts)):
-                    logger.error(f"Malformed line #{i+1} in XYT data for {filename}: '{line}'. Expected 3 or 4 numeric values.")
+                    logger.error("Malformed line #%s in XYT data for %s: '%s'. Expected 3 or 4 numeric values.", i+1, filename, line)
                     return False
             return True
         except Exception as e:
             # Catch any other unexpected errors during validation
-            logger.error(f"Unexpected exception during XYT data validation for {filename}: {str(e)}")
+            logger.error("Unexpected exception during XYT data validation for %s: %s", filename, str(e))
             return False
 
     @staticmethod
@@ -347,7 +396,7 @@ class Bozorth3Matcher:
         """
         try:
             # Create a temporary directory for processing
-            with tempfile.TemporaryDirectory() as temp_dir:
+            with tempfile.TemporaryDirectory(dir=_TMPFS_DIR) as temp_dir:
                 # Determine if inputs are base64 or binary and decode if necessary
                 probe_data = Bozorth3Matcher._ensure_binary_template(probe_template)
                 ref_data = Bozorth3Matcher._ensure_binary_template(reference_template)
@@ -355,19 +404,19 @@ class Bozorth3Matcher:
                 # Use original non-transformed minutiae
                 logger.info("Using original non-transformed minutiae coordinates")
                 
-                logger.info(f"DEBUGGING: Probe data type: {type(probe_data)}, size: {len(probe_data)} bytes")
-                logger.info(f"DEBUGGING: Reference data type: {type(ref_data)}, size: {len(ref_data)} bytes")
+                logger.info("DEBUGGING: Probe data type: %s, size: %s bytes", type(probe_data), len(probe_data))
+                logger.info("DEBUGGING: Reference data type: %s, size: %s bytes", type(ref_data), len(ref_data))
                 
                 # Log first few bytes to understand the data format
                 if isinstance(probe_data, bytes):
-                    logger.info(f"DEBUGGING: Probe data first 50 bytes: {probe_data[:50]}")
+                    logger.info("DEBUGGING: Probe data first 50 bytes: %s", probe_data[:50])
                 else:
-                    logger.info(f"DEBUGGING: Probe data first 50 chars: {str(probe_data)[:50]}")
+                    logger.info("DEBUGGING: Probe data first 50 chars: %s", str(probe_data)[:50])
                     
                 if isinstance(ref_data, bytes):
-                    logger.info(f"DEBUGGING: Reference data first 50 bytes: {ref_data[:50]}")
+                    logger.info("DEBUGGING: Reference data first 50 bytes: %s", ref_data[:50])
                 else:
-                    logger.info(f"DEBUGGING: Reference data first 50 chars: {str(ref_data)[:50]}")
+                    logger.info("DEBUGGING: Reference data first 50 chars: %s", str(ref_data)[:50])
                 
                 # Validate XYT data before writing to files and calling Bozorth3
                 if not Bozorth3Matcher._validate_xyt_data(probe_data, "probe"):
@@ -377,32 +426,33 @@ class Bozorth3Matcher:
                     logger.error("Reference XYT data is malformed. Skipping Bozorth3 matching.")
                     return {"match_score": 0, "is_match": False, "error": "Malformed reference XYT file"}
                 
-                logger.info(f"Matching fingerprints: probe template size: {len(probe_data)} bytes, "
-                           f"reference template size: {len(ref_data)} bytes")
+                logger.info("Matching fingerprints: probe template size: %s bytes, reference template size: %s bytes", len(probe_data), len(ref_data))
                 
                 # Write probe template to file
                 probe_path = os.path.join(temp_dir, "probe.xyt")
                 with open(probe_path, 'wb') as f:
                     f.write(probe_data)
                 
-                # Log the contents written to probe file
-                with open(probe_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    probe_content = f.read()
-                    logger.info(f"DEBUGGING: Probe file contents ({len(probe_content)} chars): {probe_content[:200]}...")
-                    
+                # Log the contents written to probe file (only re-read when the log will be emitted)
+                if logger.isEnabledFor(logging.INFO):
+                    with open(probe_path, 'r', encoding='utf-8', errors='ignore') as f:
+                        probe_content = f.read()
+                        logger.info("DEBUGGING: Probe file contents (%s chars): %s...", len(probe_content), probe_content[:200])
+
                 # Write reference template to file
                 ref_path = os.path.join(temp_dir, "reference.xyt")
                 with open(ref_path, 'wb') as f:
                     f.write(ref_data)
-                
-                # Log the contents written to reference file
-                with open(ref_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    ref_content = f.read()
-                    logger.info(f"DEBUGGING: Reference file contents ({len(ref_content)} chars): {ref_content[:200]}...")
+
+                # Log the contents written to reference file (only re-read when the log will be emitted)
+                if logger.isEnabledFor(logging.INFO):
+                    with open(ref_path, 'r', encoding='utf-8', errors='ignore') as f:
+                        ref_content = f.read()
+                        logger.info("DEBUGGING: Reference file contents (%s chars): %s...", len(ref_content), ref_content[:200])
                 
                 # Run BOZORTH3 for matching
                 cmd = ["bozorth3", "-A", "outfmt=spg", "-T", str(threshold), "-m1", probe_path, ref_path]
-                logger.info(f"DEBUGGING: Running Bozorth3 command: {' '.join(cmd)}")
+                logger.info("DEBUGGING: Running Bozorth3 command: %s", ' '.join(cmd))
                 
                 process = subprocess.run(
                     cmd,
@@ -410,14 +460,14 @@ class Bozorth3Matcher:
                     text=True
                 )
                 
-                logger.info(f"DEBUGGING: Bozorth3 exit code: {process.returncode}")
-                logger.info(f"DEBUGGING: Bozorth3 stdout: '{process.stdout.strip()}'")
-                logger.info(f"DEBUGGING: Bozorth3 stderr: '{process.stderr.strip()}'")
+                logger.info("DEBUGGING: Bozorth3 exit code: %s", process.returncode)
+                logger.info("DEBUGGING: Bozorth3 stdout: '%s'", process.stdout.strip())
+                logger.info("DEBUGGING: Bozorth3 stderr: '%s'", process.stderr.strip())
                 
                 # Check if the process completed successfully
                 if process.returncode != 0:
-                    logger.warning(f"BOZORTH3 returned non-zero exit code: {process.returncode}")
-                    logger.warning(f"BOZORTH3 stderr: {process.stderr}")
+                    logger.warning("BOZORTH3 returned non-zero exit code: %s", process.returncode)
+                    logger.warning("BOZORTH3 stderr: %s", process.stderr)
                     # Return a default score of 0 for failed matches
                     return {
                         "match_score": 0,
@@ -426,7 +476,7 @@ class Bozorth3Matcher:
                 
                 # Parse output
                 output = process.stdout.strip()
-                logger.info(f"BOZORTH3 output: {output}")
+                logger.info("BOZORTH3 output: %s", output)
                 
                 # Parse score from output
                 if output:
@@ -435,14 +485,14 @@ class Bozorth3Matcher:
                         try:
                             match_score = int(score_parts[0])
                             is_match = match_score >= threshold
-                            logger.info(f"Matching result: score={match_score}, threshold={threshold}, is_match={is_match}")
+                            logger.info("Matching result: score=%s, threshold=%s, is_match=%s", match_score, threshold, is_match)
                             
                             return {
                                 "match_score": match_score,
                                 "is_match": is_match
                             }
                         except ValueError:
-                            logger.error(f"Failed to parse match score from output: {output}")
+                            logger.error("Failed to parse match score from output: %s", output)
                 
                 # Default return if no score could be parsed
                 logger.warning("No match score found, returning default 0 score")
@@ -452,11 +502,11 @@ class Bozorth3Matcher:
                 }
                 
         except Exception as e:
-            logger.exception(f"Error in Bozorth3Matcher: {str(e)}")
+            logger.exception("Error in Bozorth3Matcher: %s", str(e))
             return {
                 "match_score": 0,
                 "is_match": False,
-                "error": str(e)
+                "error": error_message(e)
             }
     
     @staticmethod
@@ -479,18 +529,18 @@ class Bozorth3Matcher:
         if isinstance(template_data, str):
             try:
                 # Attempt to decode as base64
-                logger.info(f"Decoding template from base64 string (length: {len(template_data)})")
+                logger.info("Decoding template from base64 string (length: %s)", len(template_data))
                 decoded = base64.b64decode(template_data)
-                logger.info(f"Successfully decoded base64 to binary (size: {len(decoded)} bytes)")
+                logger.info("Successfully decoded base64 to binary (size: %s bytes)", len(decoded))
                 return decoded
             except Exception as e:
-                logger.error(f"Failed to decode template as base64: {str(e)}")
+                logger.error("Failed to decode template as base64: %s", str(e))
                 # If it's not valid base64, treat it as raw text
                 logger.info("Treating template as raw text data")
                 return template_data.encode('utf-8')
                 
         # For other types, convert to string and then to bytes
-        logger.warning(f"Unexpected template data type: {type(template_data)}")
+        logger.warning("Unexpected template data type: %s", type(template_data))
         return str(template_data).encode('utf-8')
     
     @staticmethod
@@ -509,7 +559,7 @@ class Bozorth3Matcher:
         from .models import FingerprintTemplate
         
         # Create a temporary file for the probe template
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.xyt') as probe_file:
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.xyt', dir=_TMPFS_DIR) as probe_file:
             probe_file.write(probe_template_data)
             probe_path = probe_file.name
         
@@ -522,8 +572,8 @@ class Bozorth3Matcher:
             
             for template in templates:
                 # Create a temporary file for the gallery template
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.xyt') as gallery_file:
-                    gallery_file.write(template.xyt_data)
+                with tempfile.NamedTemporaryFile(delete=False, suffix='.xyt', dir=_TMPFS_DIR) as gallery_file:
+                    gallery_file.write(template.get_xyt_data())
                     gallery_path = gallery_file.name
                 
                 try:
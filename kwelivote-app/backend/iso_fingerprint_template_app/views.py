@@ -1,23 +1,42 @@
 import os
 import base64
+import functools
+import hashlib
 import json
 import tempfile
 import subprocess
+import uuid
 import logging
 import shutil
 from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import render
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
-from .serializers import FingerprintTemplateInputSerializer, FingerprintTemplateOutputSerializer
 from .models import FingerprintTemplate
-from .utils import normalize_image
+from .utils import normalize_image, error_message
 from .fingerprint_processor import FingerprintProcessor
+from .fingerprint_matching import SCRATCH_ROOT, _EXTRACT_POOL
+from . import identify_cache
 
 logger = logging.getLogger(__name__)
 
+
+def _write_bytes(path, data):
+    """Write an in-memory buffer to path with a single write syscall.
+
+    XYT buffers are small and already fully materialized, so the buffered
+    file-object layer of open() only adds overhead on the matching hot path.
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+
+
 class ProcessFingerprintTemplateView(APIView):
     """
     API endpoint for processing fingerprint images into ISO templates
@@ -27,54 +46,70 @@ class ProcessFingerprintTemplateView(APIView):
     
     def post(self, request, format=None):
         """Process fingerprint images and generate ISO template"""
-        work_dir = os.path.join(os.getcwd(), "work")
+        # Per-request directory under the tmpfs scratch root: intermediates
+        # stay in RAM and concurrent requests cannot collide
+        work_dir = os.path.join(SCRATCH_ROOT, uuid.uuid4().hex)
         try:
             # Create working directory
             os.makedirs(work_dir, exist_ok=True)
             
-            # Process each fingerprint image
-            xyt_paths = []
+            # Save all fingerprint images first, then extract minutiae in
+            # parallel: each extraction is an independent mindtct
+            # subprocess, so the batch takes as long as the slowest finger
+            # instead of the sum of all of them. Uploads are small enough
+            # that Django keeps them in memory, so a single read + single
+            # write beats the chunked copy loop and its per-chunk syscalls.
+            image_paths = []
             for idx, fingerprint in enumerate(request.FILES.getlist('fingerprints')):
-                # Save fingerprint image
                 image_path = os.path.join(work_dir, f"fingerprint_{idx+1}.png")
-                with open(image_path, 'wb') as f:
-                    for chunk in fingerprint.chunks():
-                        f.write(chunk)
-                
-                # Extract minutiae
+                _write_bytes(image_path, fingerprint.read())
+                image_paths.append(image_path)
+
+            def extract_one(item):
+                idx, image_path = item
                 try:
                     xyt_data = FingerprintProcessor.extract_minutiae(image_path, work_dir)
                     xyt_path = os.path.join(work_dir, f"probe_{idx+1}.xyt")
-                    with open(xyt_path, 'wb') as f:
-                        f.write(xyt_data)
-                    xyt_paths.append(xyt_path)
+                    _write_bytes(xyt_path, xyt_data)
+                    return xyt_path
                 except Exception as e:
-                    logger.error(f"Failed to process fingerprint {idx+1}: {str(e)}")
-                    continue
-            
+                    # One bad fingerprint must not kill the batch
+                    logger.error("Failed to process fingerprint %s: %s", idx+1, str(e))
+                    return None
+
+            xyt_paths = []
+            if image_paths:
+                xyt_paths = [path for path in _EXTRACT_POOL.map(extract_one, enumerate(image_paths)) if path]
+
             if not xyt_paths:
                 return Response({"error": "No valid fingerprint templates could be generated"}, status=status.HTTP_400_BAD_REQUEST)
             
-            # Create processor instance
-            processor = FingerprintProcessor()
-            
+            # All FingerprintProcessor methods are static - no instance needed
             # Fuse minutiae points from all templates
-            fused_minutiae = processor.fuse_minutiae_points(xyt_paths)
+            fused_minutiae = FingerprintProcessor.fuse_minutiae_points(xyt_paths)
             
             # Process minutiae through the pipeline
-            canonicalized_minutiae = processor.canonicalize_minutiae(fused_minutiae)
-            quantized_minutiae = processor.quantize_minutiae(canonicalized_minutiae)
-            optimized_minutiae = processor.optimize_minutiae(quantized_minutiae)
+            canonicalized_minutiae = FingerprintProcessor.canonicalize_minutiae(fused_minutiae)
+            quantized_minutiae = FingerprintProcessor.quantize_minutiae(canonicalized_minutiae)
+            optimized_minutiae = FingerprintProcessor.optimize_minutiae(quantized_minutiae)
             
             # Generate ISO template
-            iso_template = processor.generate_iso_template(optimized_minutiae)
+            iso_template = FingerprintProcessor.generate_iso_template(optimized_minutiae)
             
             # Generate XYT data
-            xyt_data = processor.format_xyt_data(optimized_minutiae)
+            xyt_data = FingerprintProcessor.format_xyt_data(optimized_minutiae)
             
             # Generate template hash
-            template_hash = processor.generate_template_hash(optimized_minutiae)
-            
+            template_hash = FingerprintProcessor.generate_template_hash(optimized_minutiae)
+
+            # Binary variant: return the raw ISO template without base64/JSON
+            # overhead, with metadata carried in response headers
+            if request.query_params.get('format') == 'binary':
+                response = HttpResponse(content=iso_template, content_type='application/octet-stream')
+                response['X-Minutiae-Count'] = str(len(optimized_minutiae))
+                response['X-Template-Hash'] = template_hash or ''
+                return response
+
             # Create response data
             response_data = {
                 'iso_template_base64': base64.b64encode(iso_template).decode('utf-8'),
@@ -90,15 +125,33 @@ class ProcessFingerprintTemplateView(APIView):
             return Response(response_data, status=status.HTTP_200_OK)
             
         except Exception as e:
-            logger.error(f"Error processing fingerprint template: {str(e)}")
-            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            logger.error("Error processing fingerprint template: %s", str(e))
+            return Response({"error": error_message(e)}, status=status.HTTP_400_BAD_REQUEST)
             
         finally:
             # Cleanup
             try:
                 shutil.rmtree(work_dir)
             except Exception as e:
-                logger.warning(f"Failed to cleanup work directory: {str(e)}")
+                logger.warning("Failed to cleanup work directory: %s", str(e))
+
+
+@functools.lru_cache(maxsize=2048)
+def _parse_and_pipeline_iso(stored_template_b64):
+    """
+    Decode a base64 ISO template, run the stored-side minutiae pipeline
+    and return the formatted XYT bytes.
+
+    Verification commonly replays the same stored template (e.g. repeated
+    check-ins by one person), so the result is memoized on the base64 string.
+    """
+    stored_iso_data = base64.b64decode(stored_template_b64)
+    stored_minutiae = FingerprintProcessor.parse_iso_template(stored_iso_data)
+    stored_minutiae = FingerprintProcessor.canonicalize_minutiae(stored_minutiae)
+    stored_minutiae = FingerprintProcessor.quantize_minutiae(stored_minutiae)
+    stored_minutiae = FingerprintProcessor.optimize_minutiae(stored_minutiae)
+    return FingerprintProcessor.format_xyt_data(stored_minutiae)
+
 
 class VerifyFingerprintView(APIView):
     """Verify a fingerprint against a stored template"""
@@ -106,7 +159,9 @@ class VerifyFingerprintView(APIView):
     
     def post(self, request):
         """Verify a fingerprint against a stored template"""
-        work_dir = os.path.join(os.getcwd(), "work")
+        # Per-request directory under the tmpfs scratch root: intermediates
+        # stay in RAM and concurrent requests cannot collide
+        work_dir = os.path.join(SCRATCH_ROOT, uuid.uuid4().hex)
         try:
             # Create working directory
             os.makedirs(work_dir, exist_ok=True)
@@ -115,60 +170,45 @@ class VerifyFingerprintView(APIView):
             if 'fingerprint' not in request.FILES:
                 return Response({"error": "No fingerprint provided"}, status=status.HTTP_400_BAD_REQUEST)
                 
-            # Save probe fingerprint
+            # Save probe fingerprint with a single read + single write
             probe_path = os.path.join(work_dir, "probe.png")
-            with open(probe_path, 'wb') as f:
-                for chunk in request.FILES['fingerprint'].chunks():
-                    f.write(chunk)
-            
-            # Create processor instance
-            processor = FingerprintProcessor()
+            _write_bytes(probe_path, request.FILES['fingerprint'].read())
             
             # Extract minutiae from probe
             try:
-                probe_xyt_data = processor.extract_minutiae(probe_path, work_dir)
-                probe_minutiae = processor.parse_xyt_data(probe_xyt_data)
+                probe_xyt_data = FingerprintProcessor.extract_minutiae(probe_path, work_dir)
+                probe_minutiae = FingerprintProcessor.parse_xyt_data(probe_xyt_data)
             except Exception as e:
-                logger.error(f"Failed to process probe fingerprint: {str(e)}")
-                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+                logger.error("Failed to process probe fingerprint: %s", str(e))
+                return Response({"error": error_message(e)}, status=status.HTTP_400_BAD_REQUEST)
             
             # Process probe minutiae through the pipeline
-            probe_minutiae = processor.canonicalize_minutiae(probe_minutiae)
-            probe_minutiae = processor.quantize_minutiae(probe_minutiae)
-            probe_minutiae = processor.optimize_minutiae(probe_minutiae)
+            probe_minutiae = FingerprintProcessor.canonicalize_minutiae(probe_minutiae)
+            probe_minutiae = FingerprintProcessor.quantize_minutiae(probe_minutiae)
+            probe_minutiae = FingerprintProcessor.optimize_minutiae(probe_minutiae)
             
             # Format probe XYT data
-            probe_xyt_data = processor.format_xyt_data(probe_minutiae)
+            probe_xyt_data = FingerprintProcessor.format_xyt_data(probe_minutiae)
             
             # Get stored template
             stored_template_data = request.data.get('stored_template')
             if not stored_template_data:
                 return Response({"error": "No stored template provided"}, status=status.HTTP_400_BAD_REQUEST)
             
-            # Parse stored template
+            # Parse stored template and run the stored-side pipeline
+            # (memoized: repeat verifications of one template skip this)
             try:
-                stored_iso_data = base64.b64decode(stored_template_data)
-                stored_minutiae = processor.parse_iso_template(stored_iso_data)
+                stored_xyt_data = _parse_and_pipeline_iso(stored_template_data)
             except Exception as e:
-                logger.error(f"Failed to parse stored template: {str(e)}")
+                logger.error("Failed to parse stored template: %s", str(e))
                 return Response({"error": "Invalid stored template"}, status=status.HTTP_400_BAD_REQUEST)
             
-            # Process stored minutiae through the pipeline
-            stored_minutiae = processor.canonicalize_minutiae(stored_minutiae)
-            stored_minutiae = processor.quantize_minutiae(stored_minutiae)
-            stored_minutiae = processor.optimize_minutiae(stored_minutiae)
-            
-            # Format stored XYT data
-            stored_xyt_data = processor.format_xyt_data(stored_minutiae)
-            
             # Save XYT files for Bozorth3
             probe_xyt_path = os.path.join(work_dir, "probe.xyt")
             stored_xyt_path = os.path.join(work_dir, "stored.xyt")
             
-            with open(probe_xyt_path, 'wb') as f:
-                f.write(probe_xyt_data)
-            with open(stored_xyt_path, 'wb') as f:
-                f.write(stored_xyt_data)
+            _write_bytes(probe_xyt_path, probe_xyt_data)
+            _write_bytes(stored_xyt_path, stored_xyt_data)
             
             # Run Bozorth3 matching
             try:
@@ -180,7 +220,7 @@ class VerifyFingerprintView(APIView):
                 )
                 match_score = int(result.stdout.strip())
             except Exception as e:
-                logger.error(f"Bozorth3 matching failed: {str(e)}")
+                logger.error("Bozorth3 matching failed: %s", str(e))
                 return Response({"error": "Matching failed"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
             
             # Check if match score exceeds threshold
@@ -196,45 +236,123 @@ class VerifyFingerprintView(APIView):
             return Response(response_data, status=status.HTTP_200_OK)
             
         except Exception as e:
-            logger.error(f"Error verifying fingerprint: {str(e)}")
-            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            logger.error("Error verifying fingerprint: %s", str(e))
+            return Response({"error": error_message(e)}, status=status.HTTP_400_BAD_REQUEST)
             
         finally:
             # Cleanup
             try:
                 shutil.rmtree(work_dir)
             except Exception as e:
-                logger.warning(f"Failed to cleanup work directory: {str(e)}")
+                logger.warning("Failed to cleanup work directory: %s", str(e))
+
+def _match_stored_template(probe_xyt_path, template, work_dir):
+    """
+    Match a probe XYT file against one stored template using BOZORTH3.
+    Returns a match result dict, or None if matching failed for this template.
+    """
+    try:
+        # Parse stored template minutiae
+        stored_minutiae = FingerprintProcessor.parse_xyt_data(template.get_xyt_data())
+
+        # Templates flagged is_canonicalized went through the pipeline at
+        # enrollment; only legacy rows need the stored-side passes re-run
+        if not template.is_canonicalized:
+            stored_minutiae = FingerprintProcessor.canonicalize_minutiae(stored_minutiae)
+            stored_minutiae = FingerprintProcessor.quantize_minutiae(stored_minutiae)
+            stored_minutiae = FingerprintProcessor.optimize_minutiae(stored_minutiae)
+
+        # Format stored XYT data
+        stored_xyt_data = FingerprintProcessor.format_xyt_data(stored_minutiae)
+
+        # Overwrite one shared scratch file instead of creating a file per
+        # template: bozorth3 needs a path, but matching is sequential, so a
+        # single reused inode avoids N create/unlink metadata operations
+        stored_xyt_path = os.path.join(work_dir, "stored.xyt")
+        _write_bytes(stored_xyt_path, stored_xyt_data)
+
+        # Run BOZORTH3 for matching
+        process = subprocess.run(
+            ["bozorth3", probe_xyt_path, stored_xyt_path],
+            check=True,
+            capture_output=True,
+            text=True
+        )
+        match_score = int(process.stdout.strip())
+        logger.info("BOZORTH3 match score for template %s: %s", template.id, match_score)
+
+        return {
+            'template_id': template.id,
+            'national_id': template.national_id,
+            'match_score': match_score,
+            'stored_minutiae_count': len(stored_minutiae)
+        }
+    except Exception as e:
+        logger.error("Error matching against template %s: %s", template.id, str(e))
+        return None
 
 class IdentifyFingerprintView(APIView):
     """Identify a fingerprint against a database of templates"""
     permission_classes = [IsAuthenticated]
-    
+
+    @staticmethod
+    def _stored_minutiae_count(template):
+        """Best-effort minutiae count for a stored template without re-parsing it"""
+        metadata = template.metadata or {}
+        count = metadata.get('minutiae_count')
+        if isinstance(count, int):
+            return count
+        xyt_data = template.get_xyt_data()
+        if xyt_data:
+            return xyt_data.count(b'\n') + 1
+        return 0
+
     def post(self, request):
         """Identify a fingerprint against a database of templates"""
         try:
             # Create working directory
-            work_dir = os.path.join(os.getcwd(), "work")
+            work_dir = os.path.join(SCRATCH_ROOT, uuid.uuid4().hex)
             os.makedirs(work_dir, exist_ok=True)
             
             # Process probe fingerprint
             if 'fingerprint' not in request.FILES:
                 return Response({"error": "No fingerprint provided"}, status=status.HTTP_400_BAD_REQUEST)
                 
-            # Save probe fingerprint
+            # Save probe fingerprint, hashing it as it is written so repeated
+            # probes can be answered from the identification cache
+            probe_bytes = request.FILES['fingerprint'].read()
             probe_path = os.path.join(work_dir, "probe.png")
-            with open(probe_path, 'wb') as f:
-                for chunk in request.FILES['fingerprint'].chunks():
-                    f.write(chunk)
-            
+            _write_bytes(probe_path, probe_bytes)
+            probe_key = hashlib.sha256(probe_bytes).hexdigest()
+
+            # Optional early-exit controls: stop matching as soon as a score
+            # reaches early_exit_score instead of scanning the whole gallery
+            early_exit_score = request.query_params.get('early_exit_score')
+            try:
+                early_exit_score = int(early_exit_score) if early_exit_score is not None else None
+            except ValueError:
+                return Response({"error": "Invalid early_exit_score"}, status=status.HTTP_400_BAD_REQUEST)
+
+            prior_ids_param = request.query_params.get('prior_template_ids', '')
+            prior_template_ids = {int(t) for t in prior_ids_param.split(',') if t.strip().isdigit()}
+
+            # Identical probe seen recently with the same parameters and an
+            # unchanged gallery: return the cached results without any matching
+            cache_key = (probe_key, early_exit_score, tuple(sorted(prior_template_ids)),
+                         identify_cache.current_epoch())
+            cached_response = identify_cache.get(cache_key)
+            if cached_response is not None:
+                logger.info("Identification cache hit for probe %s", probe_key[:12])
+                return Response(cached_response)
+
             # Extract minutiae from probe
             try:
                 probe_xyt_data = FingerprintProcessor.extract_minutiae(probe_path, work_dir)
                 probe_minutiae = FingerprintProcessor.parse_xyt_data(probe_xyt_data)
             except Exception as e:
-                logger.error(f"Failed to process probe fingerprint: {str(e)}")
-                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
-            
+                logger.error("Failed to process probe fingerprint: %s", str(e))
+                return Response({"error": error_message(e)}, status=status.HTTP_400_BAD_REQUEST)
+
             # Process probe minutiae through the pipeline
             probe_minutiae = FingerprintProcessor.canonicalize_minutiae(probe_minutiae)
             probe_minutiae = FingerprintProcessor.quantize_minutiae(probe_minutiae)
@@ -245,67 +363,108 @@ class IdentifyFingerprintView(APIView):
             
             # Write probe XYT file for BOZORTH3
             probe_xyt_path = os.path.join(work_dir, "probe.xyt")
-            with open(probe_xyt_path, 'wb') as f:
-                f.write(probe_xyt_data)
-            
+            _write_bytes(probe_xyt_path, probe_xyt_data)
+
             # Get all stored templates
-            stored_templates = FingerprintTemplate.objects.filter(processing_status='completed')
+            stored_templates = list(FingerprintTemplate.objects.filter(processing_status='completed'))
             if not stored_templates:
                 return Response({"error": "No stored templates available"}, status=status.HTTP_404_NOT_FOUND)
-            
+
+            # Try the most likely candidates first: any caller-provided prior
+            # templates, then templates whose minutiae count is closest to the probe's
+            probe_count = len(probe_minutiae)
+            stored_templates.sort(
+                key=lambda t: (t.id not in prior_template_ids,
+                               abs(self._stored_minutiae_count(t) - probe_count))
+            )
+
             # Match against each stored template
             match_results = []
             for template in stored_templates:
-                try:
-                    # Parse stored template minutiae
-                    stored_minutiae = FingerprintProcessor.parse_xyt_data(template.xyt_data)
-                    
-                    # Process stored minutiae through the pipeline
-                    stored_minutiae = FingerprintProcessor.canonicalize_minutiae(stored_minutiae)
-                    stored_minutiae = FingerprintProcessor.quantize_minutiae(stored_minutiae)
-                    stored_minutiae = FingerprintProcessor.optimize_minutiae(stored_minutiae)
-                    
-                    # Format stored XYT data
-                    stored_xyt_data = FingerprintProcessor.format_xyt_data(stored_minutiae)
-                    
-                    # Write stored XYT file for BOZORTH3
-                    stored_xyt_path = os.path.join(work_dir, f"stored_{template.id}.xyt")
-                    with open(stored_xyt_path, 'wb') as f:
-                        f.write(stored_xyt_data)
-                    
-                    # Run BOZORTH3 for matching
-                    process = subprocess.run(
-                        ["bozorth3", probe_xyt_path, stored_xyt_path],
-                        check=True,
-                        capture_output=True,
-                        text=True
-                    )
-                    match_score = int(process.stdout.strip())
-                    logger.info(f"BOZORTH3 match score for template {template.id}: {match_score}")
-                    
-                    match_results.append({
-                        'template_id': template.id,
-                        'national_id': template.national_id,
-                        'match_score': match_score,
-                        'stored_minutiae_count': len(stored_minutiae)
-                    })
-                    
-                except Exception as e:
-                    logger.error(f"Error matching against template {template.id}: {str(e)}")
+                result = _match_stored_template(probe_xyt_path, template, work_dir)
+                if result is None:
                     continue
-            
+                match_results.append(result)
+
+                # A confident match was found - skip the rest of the gallery
+                if early_exit_score is not None and result['match_score'] >= early_exit_score:
+                    logger.info("Early exit: template %s scored %s >= %s", template.id, result['match_score'], early_exit_score)
+                    break
+
             # Sort results by match score in descending order
             match_results.sort(key=lambda x: x['match_score'], reverse=True)
-            
-            return Response({
+
+            response_data = {
                 'probe_minutiae_count': len(probe_minutiae),
                 'match_results': match_results
-            })
+            }
+            identify_cache.put(cache_key, response_data)
+
+            return Response(response_data)
             
         except Exception as e:
-            logger.error(f"Error identifying fingerprint: {str(e)}")
-            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-            
+            logger.error("Error identifying fingerprint: %s", str(e))
+            return Response({"error": error_message(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
         finally:
             # Cleanup temporary files
             shutil.rmtree(work_dir, ignore_errors=True)
+
+class IdentifyFingerprintStreamView(APIView):
+    """
+    Identify a fingerprint and stream match results as Server-Sent Events.
+
+    Matching runs inside the response generator, so each template's score is
+    delivered as soon as bozorth3 produces it and the client can close the
+    stream early once a strong enough match arrives.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        """Stream identification results against the stored template gallery"""
+        os.makedirs(SCRATCH_ROOT, exist_ok=True)
+        work_dir = tempfile.mkdtemp(prefix="identify_stream_", dir=SCRATCH_ROOT)
+        try:
+            # Process probe fingerprint
+            if 'fingerprint' not in request.FILES:
+                shutil.rmtree(work_dir, ignore_errors=True)
+                return Response({"error": "No fingerprint provided"}, status=status.HTTP_400_BAD_REQUEST)
+
+            # Save probe fingerprint with a single read + single write
+            probe_path = os.path.join(work_dir, "probe.png")
+            _write_bytes(probe_path, request.FILES['fingerprint'].read())
+
+            # Extract minutiae from probe and run it through the pipeline
+            probe_xyt_data = FingerprintProcessor.extract_minutiae(probe_path, work_dir)
+            probe_minutiae = FingerprintProcessor.parse_xyt_data(probe_xyt_data)
+            probe_minutiae = FingerprintProcessor.canonicalize_minutiae(probe_minutiae)
+            probe_minutiae = FingerprintProcessor.quantize_minutiae(probe_minutiae)
+            probe_minutiae = FingerprintProcessor.optimize_minutiae(probe_minutiae)
+            probe_xyt_data = FingerprintProcessor.format_xyt_data(probe_minutiae)
+
+            # Write probe XYT file for BOZORTH3
+            probe_xyt_path = os.path.join(work_dir, "probe.xyt")
+            _write_bytes(probe_xyt_path, probe_xyt_data)
+
+            stored_templates = list(FingerprintTemplate.objects.filter(processing_status='completed'))
+        except Exception as e:
+            shutil.rmtree(work_dir, ignore_errors=True)
+            logger.error("Failed to process probe fingerprint: %s", str(e))
+            return Response({"error": error_message(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        def event_stream():
+            try:
+                for template in stored_templates:
+                    result = _match_stored_template(probe_xyt_path, template, work_dir)
+                    if result is None:
+                        continue
+                    yield f"event: match\ndata: {json.dumps(result)}\n\n"
+                yield f"event: done\ndata: {json.dumps({'probe_minutiae_count': len(probe_minutiae), 'templates_compared': len(stored_templates)})}\n\n"
+            finally:
+                # Cleanup runs when the stream completes or the client disconnects
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+        response = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
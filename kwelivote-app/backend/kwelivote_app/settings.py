@@ -158,6 +158,12 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # REST Framework settings
 REST_FRAMEWORK = {
+    # orjson-backed renderer (falls back to stdlib json when orjson is not
+    # installed); the browsable API stays available for development
+    'DEFAULT_RENDERER_CLASSES': [
+        'iso_fingerprint_template_app.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],